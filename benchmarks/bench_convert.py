@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""比较树 / 链表转换函数新旧实现在大规模节点上的耗时与内存
+
+用法: python benchmarks/bench_convert.py [--nodes 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from leetcode_tester import LeetCodeTester  # noqa: E402
+
+
+class LegacyTreeNode:
+    def __init__(self, val=0, left=None, right=None):
+        self.val = val
+        self.left = left
+        self.right = right
+
+
+class LegacyListNode:
+    def __init__(self, val=0, next=None):
+        self.val = val
+        self.next = next
+
+
+def legacy_build_tree(nodes):
+    """旧实现：没有 __slots__ 的节点"""
+    if not nodes or nodes[0] is None:
+        return None
+    root = LegacyTreeNode(nodes[0])
+    queue = deque([root])
+    i = 1
+    while queue and i < len(nodes):
+        node = queue.popleft()
+        if i < len(nodes) and nodes[i] is not None:
+            node.left = LegacyTreeNode(nodes[i])
+            queue.append(node.left)
+        i += 1
+        if i < len(nodes) and nodes[i] is not None:
+            node.right = LegacyTreeNode(nodes[i])
+            queue.append(node.right)
+        i += 1
+    return root
+
+
+def legacy_tree_to_list(root):
+    """旧实现：每个缺失的子节点都入队，最后再去掉末尾的 None"""
+    if not root:
+        return []
+    result = []
+    queue = deque([root])
+    while queue:
+        node = queue.popleft()
+        if node:
+            result.append(node.val)
+            queue.append(node.left)
+            queue.append(node.right)
+        else:
+            result.append(None)
+    while result and result[-1] is None:
+        result.pop()
+    return result
+
+
+def legacy_build_list(arr):
+    """旧实现：复制 arr[1:] 后逐个追加"""
+    if not arr:
+        return None
+    head = LegacyListNode(arr[0])
+    current = head
+    for val in arr[1:]:
+        current.next = LegacyListNode(val)
+        current = current.next
+    return head
+
+
+def legacy_list_to_array(head):
+    """旧实现：没有环检测"""
+    result = []
+    current = head
+    while current:
+        result.append(current.val)
+        current = current.next
+    return result
+
+
+def measure(fn, arg):
+    """返回 (耗时秒, 内存峰值字节, 结果常驻字节)"""
+    start = time.perf_counter()
+    value = fn(arg)
+    elapsed = time.perf_counter() - start
+    del value
+
+    tracemalloc.start()
+    value = fn(arg)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del value
+    return elapsed, peak, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=10**6)
+    args = parser.parse_args()
+    n = args.nodes
+    tester = LeetCodeTester()
+
+    rng = random.Random(n)
+    values = [rng.randint(-1000, 1000) for _ in range(n)]
+    # 退化树：每层只有右孩子，层序表示为 [v, None, v, None, v, ...]
+    degenerate = [values[0]]
+    for v in values[1:n // 2]:
+        degenerate.extend([None, v])
+
+    legacy_complete, new_complete = legacy_build_tree(values), tester.build_tree_from_list(values)
+    legacy_chain, new_chain = legacy_build_tree(degenerate), tester.build_tree_from_list(degenerate)
+    legacy_linked, new_linked = legacy_build_list(values), tester.build_list_from_array(values)
+
+    rows = [
+        ("build tree (complete)", legacy_build_tree, tester.build_tree_from_list, values),
+        ("build tree (degenerate)", legacy_build_tree, tester.build_tree_from_list, degenerate),
+        ("tree_to_list (complete)", legacy_tree_to_list, tester.tree_to_list, (legacy_complete, new_complete)),
+        ("tree_to_list (degenerate)", legacy_tree_to_list, tester.tree_to_list, (legacy_chain, new_chain)),
+        ("build linked list", legacy_build_list, tester.build_list_from_array, values),
+        ("list_to_array", legacy_list_to_array, tester.list_to_array, (legacy_linked, new_linked)),
+    ]
+
+    print(f"{'n=' + str(n):<28}{'impl':<8}{'time':>12}{'peak mem':>12}{'retained':>12}")
+    print("-" * 72)
+    for label, legacy_fn, new_fn, arg in rows:
+        legacy_arg, new_arg = arg if isinstance(arg, tuple) else (arg, arg)
+        for impl, fn, fn_arg in (("legacy", legacy_fn, legacy_arg), ("new", new_fn, new_arg)):
+            elapsed, peak, retained = measure(fn, fn_arg)
+            print(f"{label:<28}{impl:<8}{elapsed * 1000:>10.1f}ms"
+                  f"{peak / 2**20:>10.1f}MB{retained / 2**20:>10.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
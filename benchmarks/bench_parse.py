@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""比较 parse_input_line 新旧实现在大输入上的解析耗时与内存峰值
+
+用法: python benchmarks/bench_parse.py [--sizes 100000 1000000]
+"""
+import argparse
+import ast
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from leetcode_tester import LeetCodeTester  # noqa: E402
+
+
+def legacy_parse_input_line(line: str):
+    """旧实现：整行 replace 后交给 ast.literal_eval"""
+    line = line.strip()
+    line = line.replace('null', 'None')
+    line = line.replace('true', 'True')
+    line = line.replace('false', 'False')
+    try:
+        return ast.literal_eval(line)
+    except:
+        if line.startswith('"') and line.endswith('"'):
+            return line[1:-1]
+        elif line.startswith("'") and line.endswith("'"):
+            return line[1:-1]
+        else:
+            return line
+
+
+def measure(parse, line: str):
+    """返回 (耗时秒, 内存峰值字节, 结果常驻字节)，耗时与内存分两次测量以免互相干扰"""
+    start = time.perf_counter()
+    value = parse(line)
+    elapsed = time.perf_counter() - start
+    del value
+
+    tracemalloc.start()
+    value = parse(line)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del value
+    return elapsed, peak, retained
+
+
+def make_lines(n: int):
+    rng = random.Random(n)
+    ints = "[" + ",".join(str(rng.randint(-10**9, 10**9)) for _ in range(n)) + "]"
+    tree = "[" + ",".join("null" if rng.random() < 0.2 else str(rng.randint(-1000, 1000))
+                          for _ in range(n)) + "]"
+    return [("int array", ints), ("tree with nulls", tree)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**5, 10**6])
+    args = parser.parse_args()
+
+    tester = LeetCodeTester()
+    compact = LeetCodeTester()
+    compact.int_array_mode = "array"
+
+    parsers = [
+        ("legacy replace+literal_eval", legacy_parse_input_line),
+        ("json fast path", tester.parse_input_line),
+        ("compact array('q')", lambda line: compact.parse_input_line(line, compact=True)),
+    ]
+
+    print(f"{'input':<26}{'parser':<30}{'time':>12}{'peak mem':>12}{'retained':>12}")
+    print("-" * 92)
+    for n in args.sizes:
+        for label, line in make_lines(n):
+            for name, parse in parsers:
+                elapsed, peak, retained = measure(parse, line)
+                print(f"{f'{label} n={n}':<26}{name:<30}"
+                      f"{elapsed * 1000:>10.1f}ms{peak / 2**20:>10.1f}MB{retained / 2**20:>10.1f}MB")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""测量 leetcode_tester 的启动开销：-X importtime 导入耗时与一次最小运行的端到端耗时
+
+端到端耗时按扣除解释器自身启动（python -c pass）后的额外开销计算：通过启动脚本 lutf.py
+运行（从字节码缓存导入）与导入耗时共用 --budget-ms，直接运行 leetcode_tester.py（每次重新编译）
+使用 --script-budget-ms。超出任一预算，或导入时加载了应按需导入的模块，以非零状态退出。
+
+用法: python benchmarks/bench_startup.py [--repeat 7] [--budget-ms 40] [--script-budget-ms 100] [--top 10]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# 导入 leetcode_tester 时不应加载的模块：只在对应功能被使用时才导入
+LAZY_MODULES = ("difflib", "colorama", "typing", "inspect", "multiprocessing", "concurrent.futures",
+                "sqlite3", "tracemalloc", "statistics", "subprocess", "tempfile", "hashlib", "pickle",
+                "ast", "argparse")
+
+SOLUTION = '''class Solution:
+    def twoSum(self, nums, target):
+        seen = {}
+        for i, x in enumerate(nums):
+            if target - x in seen:
+                return [seen[target - x], i]
+            seen[x] = i
+'''
+
+
+def python_env():
+    """子进程环境：允许写入字节码缓存，并能以 -m 找到 leetcode_tester"""
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def import_profile(env):
+    """运行一次 -X importtime，返回 (总耗时微秒, [(自身耗时, 累计耗时, 模块名), ...])"""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import leetcode_tester"],
+                          cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entries.append((int(self_us), int(cumulative_us), name[1:]))
+
+    # importtime 先输出子模块，leetcode_tester 之前缩进更深的行都是它导入的
+    for index in range(len(entries) - 1, -1, -1):
+        if entries[index][2].strip() == "leetcode_tester":
+            break
+    else:
+        raise RuntimeError("leetcode_tester not found in -X importtime output")
+    children = []
+    for entry in reversed(entries[:index]):
+        if entry[2] == entry[2].lstrip():
+            break
+        children.append((entry[0], entry[1], entry[2].strip()))
+    return entries[index][1], children
+
+
+def best_wall_time(cmd, cwd, env, repeat):
+    """命令的最短墙钟耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--budget-ms", type=float, default=40.0,
+                        help="fail if importing leetcode_tester, or a run through lutf.py beyond bare "
+                             "interpreter startup, takes longer than this (best of --repeat)")
+    parser.add_argument("--script-budget-ms", type=float, default=100.0,
+                        help="same for running leetcode_tester.py directly, which recompiles it every time")
+    parser.add_argument("--top", type=int, default=10, help="modules to list by self time")
+    args = parser.parse_args()
+
+    env = python_env()
+    # 第一次运行写入字节码缓存，不计入结果
+    import_profile(env)
+    runs = [import_profile(env) for _ in range(args.repeat)]
+    total_us, children = min(runs, key=lambda run: run[0])
+
+    print(f"import leetcode_tester: {total_us / 1000:.1f}ms (best of {args.repeat}, budget {args.budget_ms:.0f}ms)")
+    print(f"{'module':<32}{'self':>10}{'cumulative':>12}")
+    print("-" * 54)
+    for self_us, cumulative_us, name in sorted(children, reverse=True)[:args.top]:
+        print(f"{name:<32}{self_us / 1000:>8.1f}ms{cumulative_us / 1000:>10.1f}ms")
+    print()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        with open(os.path.join(workdir, "solution.py"), "w", encoding="utf-8") as f:
+            f.write(SOLUTION)
+        with open(os.path.join(workdir, "input.txt"), "w", encoding="utf-8") as f:
+            f.write("[2,7,11,15]\n9\n")
+        with open(os.path.join(workdir, "output.txt"), "w", encoding="utf-8") as f:
+            f.write("[0,1]\n")
+
+        # (名称, 命令, 额外开销预算毫秒)
+        commands = [
+            ("python lutf.py", [sys.executable, os.path.join(ROOT, "lutf.py"), "solution.py"], args.budget_ms),
+            ("python leetcode_tester.py", [sys.executable, os.path.join(ROOT, "leetcode_tester.py"), "solution.py"],
+             args.script_budget_ms),
+            ("python -m leetcode_tester", [sys.executable, "-m", "leetcode_tester", "solution.py"], None),
+        ]
+        baseline = best_wall_time([sys.executable, "-c", "pass"], workdir, env, args.repeat)
+        print(f"{'end-to-end (1 case)':<32}{'wall':>10}{'overhead':>12}{'budget':>10}")
+        print("-" * 64)
+        print(f"{'python -c pass':<32}{baseline * 1000:>8.1f}ms")
+        over_budget = []
+        for label, cmd, budget_ms in commands:
+            elapsed = best_wall_time(cmd, workdir, env, args.repeat)
+            overhead_ms = (elapsed - baseline) * 1000
+            budget_text = f"{budget_ms:.0f}ms" if budget_ms is not None else "-"
+            print(f"{label:<32}{elapsed * 1000:>8.1f}ms{overhead_ms:>10.1f}ms{budget_text:>10}")
+            if budget_ms is not None and overhead_ms > budget_ms:
+                over_budget.append((label, overhead_ms, budget_ms))
+    print()
+
+    failed = False
+    for label, overhead_ms, budget_ms in over_budget:
+        print(f"❌ {label} adds {overhead_ms:.1f}ms to interpreter startup, exceeds budget {budget_ms:.0f}ms")
+        failed = True
+    eager = sorted(name for _, _, name in children if name in LAZY_MODULES)
+    if eager:
+        print(f"❌ imported eagerly: {', '.join(eager)}")
+        failed = True
+    if total_us / 1000 > args.budget_ms:
+        print(f"❌ import time {total_us / 1000:.1f}ms exceeds budget {args.budget_ms:.0f}ms")
+        failed = True
+    if not failed:
+        print("✓ within startup budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
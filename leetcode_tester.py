@@ -1,34 +1,61 @@
 #!/usr/bin/env python3
+from __future__ import annotations
 import sys
 import json
 import re
-import ast
 import time
 import os
-from typing import List, Optional, Dict, Any
-from collections import defaultdict, deque
+import marshal
+import copy
+import gc
+import math
+import signal
+import reprlib
+import struct
+import types
+import operator
+import zlib
+from collections import defaultdict, deque, Counter
+from itertools import islice, compress
 import heapq
-import difflib
+from array import array
 
-# Try to import colorama, fallback to no colors if not available
-try:
-    from colorama import Fore, Back, Style, init
+# 只有类型检查器会导入 typing；运行时注解保持为字符串（见 from __future__ import annotations）
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import List, Optional, Dict, Any
+    import random
+
+# 颜色输出在 main() 中按需启用（仅当 stdout 是终端时才导入 colorama），导入本模块没有副作用
+class MockColor:
+    def __getattr__(self, name):
+        return ""
+
+Fore = Back = Style = MockColor()
+COLORS_AVAILABLE = False
+COLORAMA_MISSING = False
+
+def setup_colors():
+    """stdout 是终端时导入并初始化 colorama；输出被重定向时不着色"""
+    global Fore, Back, Style, COLORS_AVAILABLE, COLORAMA_MISSING
+    if not sys.stdout.isatty():
+        return
+    try:
+        from colorama import Fore, Back, Style, init
+    except ImportError:
+        COLORAMA_MISSING = True
+        return
     init(autoreset=True)
     COLORS_AVAILABLE = True
-except ImportError:
-    # Fallback: no colors
-    class MockColor:
-        def __getattr__(self, name):
-            return ""
-    
-    Fore = Back = Style = MockColor()
-    COLORS_AVAILABLE = False
-    
-    def init(autoreset=True):
-        pass
+
+# LeetCode 字面量解析：字符串字面量或 null/true/false 关键字，保证只替换字符串外的关键字
+LITERAL_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'|\b(null|true|false)\b')
+LITERAL_KEYWORDS = {'null': 'None', 'true': 'True', 'false': 'False'}
 
 # 定义TreeNode类（如果题目需要）
 class TreeNode:
+    __slots__ = ('val', 'left', 'right')
+    
     def __init__(self, val=0, left=None, right=None):
         self.val = val
         self.left = left
@@ -39,6 +66,8 @@ class TreeNode:
 
 # 定义ListNode类（如果题目需要）
 class ListNode:
+    __slots__ = ('val', 'next')
+    
     def __init__(self, val=0, next=None):
         self.val = val
         self.next = next
@@ -46,12 +75,1442 @@ class ListNode:
     def __repr__(self):
         return f"ListNode({self.val})"
 
+# LeetCode 中名为 Node 的三种节点（N 叉树、图、带随机指针的链表），解决方案没有自行定义 Node 时使用
+class NaryNode:
+    __slots__ = ('val', 'children')
+    
+    def __init__(self, val=None, children=None):
+        self.val = val
+        self.children = children if children is not None else []
+    
+    def __repr__(self):
+        return f"Node({self.val})"
+
+class GraphNode:
+    __slots__ = ('val', 'neighbors')
+    
+    def __init__(self, val=0, neighbors=None):
+        self.val = val
+        self.neighbors = neighbors if neighbors is not None else []
+    
+    def __repr__(self):
+        return f"Node({self.val})"
+
+class RandomListNode:
+    __slots__ = ('val', 'next', 'random')
+    
+    def __init__(self, x=0, next=None, random=None):
+        self.val = x
+        self.next = next
+        self.random = random
+    
+    def __repr__(self):
+        return f"Node({self.val})"
+
+def build_binary_tree(node_class: type, values: List):
+    """从层序列表构建二叉树：[1,null,2,3]"""
+    if not values or values[0] is None:
+        return None
+    
+    root = node_class(values[0])
+    queue = deque([root])
+    popleft, append = queue.popleft, queue.append
+    n = len(values)
+    i = 1
+    
+    while queue and i < n:
+        node = popleft()
+        
+        # 添加左子节点
+        val = values[i]
+        if val is not None:
+            node.left = node_class(val)
+            append(node.left)
+        i += 1
+        
+        # 添加右子节点
+        if i < n:
+            val = values[i]
+            if val is not None:
+                node.right = node_class(val)
+                append(node.right)
+        i += 1
+    
+    return root
+
+def check_repeated_nodes(nodes: List, seen: set) -> int:
+    """检查遍历列表中新追加的节点是否已出现过（树中有环），返回下一次检查时的列表长度；
+    长度每增长 4 倍检查一次，每个节点至多加入集合一次，有环时遍历在实际节点数的 4 倍以内停止"""
+    new = nodes[len(seen):]
+    # 未重载 __eq__ / __hash__ 的节点按身份比较，直接放入集合，省去为每个节点创建 id 整数
+    if all(kind.__hash__ is object.__hash__ for kind in set(map(type, new))):
+        seen.update(new)
+    else:
+        seen.update(map(id, new))
+    if len(seen) < len(nodes):
+        raise CyclicStructureError(
+            f"Node reached twice in returned tree after {len(nodes)} visits (cycle or shared subtree)")
+    return 4 * len(nodes)
+
+def serialize_binary_tree(root) -> List:
+    """将二叉树转换为层序列表，末尾的 null 不写出；树中有环时抛出 CyclicStructureError"""
+    if not root:
+        return []
+    
+    result = [root.val]
+    # 按层序追加到列表中并同时遍历它，列表兼作判环的已访问节点记录
+    nodes = [root]
+    append = nodes.append
+    seen = set()
+    check_at = 1024
+    # 缺失的子节点先只计数，遇到下一个真实节点时才补 None，末尾的 None 不会写入结果
+    pending_none = 0
+    
+    for node in nodes:
+        for child in (node.left, node.right):
+            if child is None:
+                pending_none += 1
+            else:
+                if pending_none:
+                    result.extend([None] * pending_none)
+                    pending_none = 0
+                result.append(child.val)
+                append(child)
+        if len(nodes) >= check_at:
+            check_at = check_repeated_nodes(nodes, seen)
+    
+    return result
+
+def build_linked_list(node_class: type, values: List):
+    """从数组构建链表"""
+    if not values:
+        return None
+    
+    # 从尾部向前构建，不复制 values[1:]
+    head = None
+    for i in range(len(values) - 1, -1, -1):
+        head = node_class(values[i], head)
+    return head
+
+def serialize_linked_list(head) -> List:
+    """将链表转换为数组，链表有环时抛出 CyclicStructureError"""
+    result = []
+    append = result.append
+    current = head
+    # Brent 判环：tortoise 每隔 2 的幂次步跳到当前节点，O(1) 额外内存
+    power = 1
+    while current is not None:
+        tortoise = current
+        for _ in range(power):
+            append(current.val)
+            current = current.next
+            if current is tortoise:
+                raise CyclicStructureError(
+                    f"Cycle detected in returned linked list after {len(result)} nodes")
+            if current is None:
+                break
+        power *= 2
+    return result
+
+def build_nary_tree(node_class: type, values: List):
+    """从 N 叉树的层序列表构建：每组子节点以 null 结束，[1,null,3,2,4,null,5,6]"""
+    if not values or values[0] is None:
+        return None
+    
+    root = node_class(values[0], [])
+    queue = deque([root])
+    n = len(values)
+    i = 2  # 跳过根节点后的 null
+    while queue and i < n:
+        node = queue.popleft()
+        while i < n and values[i] is not None:
+            child = node_class(values[i], [])
+            node.children.append(child)
+            queue.append(child)
+            i += 1
+        i += 1
+    return root
+
+def serialize_nary_tree(root) -> List:
+    """将 N 叉树转换为层序列表；树中有环时抛出 CyclicStructureError"""
+    if root is None:
+        return []
+    
+    result = [root.val, None]
+    nodes = [root]
+    seen = set()
+    check_at = 1024
+    for node in nodes:
+        for child in node.children or ():
+            result.append(child.val)
+            nodes.append(child)
+        result.append(None)
+        if len(nodes) >= check_at:
+            check_at = check_repeated_nodes(nodes, seen)
+    while result[-1] is None:
+        result.pop()
+    return result
+
+def build_graph(node_class: type, adjacency: List):
+    """从邻接表构建无向图，节点值为 1..n，返回节点 1"""
+    if not adjacency:
+        return None
+    nodes = [node_class(i + 1, []) for i in range(len(adjacency))]
+    for node, neighbors in zip(nodes, adjacency):
+        node.neighbors = [nodes[j - 1] for j in neighbors]
+    return nodes[0]
+
+def serialize_graph(node) -> List:
+    """将图转换为按节点值排列的邻接表（只包含从 node 可达的节点）"""
+    if node is None:
+        return []
+    
+    seen = {id(node): node}
+    queue = deque([node])
+    while queue:
+        for neighbor in queue.popleft().neighbors:
+            if id(neighbor) not in seen:
+                seen[id(neighbor)] = neighbor
+                queue.append(neighbor)
+    return [[neighbor.val for neighbor in current.neighbors]
+            for current in sorted(seen.values(), key=lambda current: current.val)]
+
+def build_random_list(node_class: type, pairs: List):
+    """从 [[val, random_index], ...] 构建带随机指针的链表"""
+    nodes = [node_class(val) for val, _ in pairs]
+    for i, (_, random_index) in enumerate(pairs):
+        if i + 1 < len(nodes):
+            nodes[i].next = nodes[i + 1]
+        if random_index is not None:
+            nodes[i].random = nodes[random_index]
+    return nodes[0] if nodes else None
+
+def serialize_random_list(head) -> List:
+    """将带随机指针的链表转换为 [[val, random_index], ...]"""
+    index = {}
+    nodes = []
+    current = head
+    while current is not None:
+        if id(current) in index:
+            raise CyclicStructureError(f"Cycle detected in returned linked list after {len(nodes)} nodes")
+        index[id(current)] = len(nodes)
+        nodes.append(current)
+        current = current.next
+    
+    result = []
+    for node in nodes:
+        if node.random is None:
+            result.append([node.val, None])
+        elif id(node.random) in index:
+            result.append([node.val, index[id(node.random)]])
+        else:
+            raise InvalidOutputError(f"random pointer of node {len(result)} points outside the returned list")
+    return result
+
+class NodeType:
+    """一种节点类型：解决方案中的类名、默认实现，以及与 LeetCode 序列化格式之间的转换"""
+    def __init__(self, class_name: str, default_class: type, build, serialize, marker: Optional[str] = None):
+        self.class_name = class_name
+        self.default_class = default_class
+        self.build = build
+        self.serialize = serialize
+        # 同名的 Node 类型靠构造函数中的这个参数区分（如图节点的 neighbors）
+        self.marker = marker
+
+# 可在 schema 中使用的节点类型名称；新增节点类型时在此注册
+NODE_TYPES = {
+    'TreeNode': NodeType('TreeNode', TreeNode, build_binary_tree, serialize_binary_tree),
+    'ListNode': NodeType('ListNode', ListNode, build_linked_list, serialize_linked_list),
+    'NaryNode': NodeType('Node', NaryNode, build_nary_tree, serialize_nary_tree, marker='children'),
+    'GraphNode': NodeType('Node', GraphNode, build_graph, serialize_graph, marker='neighbors'),
+    'RandomListNode': NodeType('Node', RandomListNode, build_random_list, serialize_random_list, marker='random'),
+}
+
+# 复杂度估计的候选复杂度类：名称 -> log2(f(n))
+COMPLEXITY_CLASSES = [
+    ('O(1)', lambda n: 0.0),
+    ('O(log n)', lambda n: math.log2(math.log2(n))),
+    ('O(n)', lambda n: math.log2(n)),
+    ('O(n log n)', lambda n: math.log2(n) + math.log2(math.log2(n))),
+    ('O(n^2)', lambda n: 2 * math.log2(n)),
+    ('O(n^3)', lambda n: 3 * math.log2(n)),
+]
+
+# 用例指令，写在 input.txt 用例块中，如：#! timeout=2 cpu=1 memory=256 compare=unordered tol=1e-5
+# 以及参数 / 返回值类型：#! schema=Optional[TreeNode],int returns=List[int]（类型表达式中不能有空格）
+# 只有指令没有参数的块（指令后紧跟空行）作用于文件中之后的所有用例
+LIMITS_DIRECTIVE = '#!'
+# 指令键 -> 限制名（timeout: 墙钟秒数，cpu: CPU 秒数，memory: 额外可分配内存 MB）
+LIMIT_KEYS = {'timeout': 'timeout', 'cpu': 'cpu_time', 'memory': 'memory_mb'}
+
+class InvalidOutputError(ValueError):
+    """解决方案返回的结构无法转换为 LeetCode 格式"""
+
+class CyclicStructureError(InvalidOutputError):
+    """解决方案返回的链表或树中存在环"""
+
+class TestCase(list):
+    """一个测试用例的参数列表，附带该用例的资源限制、比较方式和输入 schema"""
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.limits = {}
+        self.compare = {}
+        self.schema = None
+
+class LimitExceeded:
+    """资源超限的判定结果"""
+    TLE = "Time Limit Exceeded"
+    MLE = "Memory Limit Exceeded"
+    
+    def __init__(self, verdict: str, detail: str = ""):
+        self.verdict = verdict
+        self.detail = detail
+    
+    def __eq__(self, other):
+        return isinstance(other, LimitExceeded) and self.verdict == other.verdict
+    
+    def __repr__(self):
+        return f"{self.verdict} ({self.detail})" if self.detail else self.verdict
+
+class DiskCache:
+    """按内容哈希索引的磁盘缓存：解析后的测试用例（pickle）和编译后的解决方案（marshal）"""
+    # 缓存格式版本，解析逻辑变化时递增以作废旧缓存
+    FORMAT_VERSION = 3
+    INDEX_FILE = 'index.json'
+    
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index = None
+    
+    def load_index(self) -> Dict:
+        """文件元数据索引：路径 -> [mtime_ns, size, sha256]"""
+        if self.index is None:
+            try:
+                with open(os.path.join(self.cache_dir, self.INDEX_FILE), 'r', encoding='utf-8') as f:
+                    self.index = json.load(f)
+            except (OSError, ValueError):
+                self.index = {}
+        return self.index
+    
+    def file_digest(self, path: str) -> str:
+        """文件内容哈希；mtime 和大小未变时直接使用索引中的哈希"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        index = self.load_index()
+        entry = index.get(path)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+        
+        import hashlib
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        index[path] = [stat.st_mtime_ns, stat.st_size, digest.hexdigest()]
+        self.write_file(self.INDEX_FILE, json.dumps(index).encode('utf-8'))
+        return index[path][2]
+    
+    def make_key(self, *parts) -> str:
+        """由若干部分组合出缓存键"""
+        import hashlib
+        text = '|'.join(str(part) for part in (self.FORMAT_VERSION,) + parts)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    def entry_path(self, kind: str, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{kind}-{key}.bin")
+    
+    def load(self, kind: str, key: str):
+        """读取缓存条目，未命中时返回 None"""
+        path = self.entry_path(kind, key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        # 更新 mtime，淘汰时按最近使用时间排序
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+    
+    def store(self, kind: str, key: str, data: bytes):
+        """写入缓存条目，并在超出容量时淘汰最久未使用的条目"""
+        self.write_file(os.path.basename(self.entry_path(kind, key)), data)
+        self.evict()
+    
+    def write_file(self, name: str, data: bytes):
+        """原子写入缓存目录中的文件"""
+        import tempfile
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, os.path.join(self.cache_dir, name))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+    
+    def evict(self):
+        """按最近使用时间淘汰条目，直到总大小不超过 max_bytes"""
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.bin') and entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+        
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+
+def default_cache_dir() -> str:
+    """缓存目录：$LUTF_CACHE_DIR，否则 $XDG_CACHE_HOME/lutf 或 ~/.cache/lutf"""
+    if os.environ.get('LUTF_CACHE_DIR'):
+        return os.environ['LUTF_CACHE_DIR']
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'lutf')
+
+class PerfHistory:
+    """用例耗时历史（SQLite），按解决方案哈希和用例哈希记录，用于发现性能回退"""
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS timings (
+            suite TEXT NOT NULL,
+            case_hash TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            run_id INTEGER NOT NULL,
+            solution_hash TEXT NOT NULL,
+            seconds REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS timings_case ON timings (suite, case_hash, kind, run_id);
+    """
+    
+    def __init__(self, path: str, window: int = 10, threshold: float = 0.5,
+                 noise_factor: float = 3.0, min_delta: float = 1e-3):
+        self.path = path
+        # 基线取最近 window 次运行；超出基线中位数 threshold 比例、噪声 noise_factor 倍
+        # 且绝对差值超过 min_delta 秒才算回退（或提升）
+        self.window = window
+        self.threshold = threshold
+        self.noise_factor = noise_factor
+        self.min_delta = min_delta
+        self.conn = None
+        self.run_id = 0
+    
+    def open(self):
+        if self.conn is None:
+            import sqlite3
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self.conn = sqlite3.connect(self.path)
+            self.conn.executescript(self.SCHEMA)
+        return self.conn
+    
+    def start_run(self):
+        """开始新一轮运行；本轮记录的耗时不参与本轮的基线"""
+        self.open()
+        self.run_id = time.time_ns()
+    
+    def baseline(self, suite: str, case_hash: str, kind: str):
+        """最近若干次运行的 (中位数, 稳健标准差, 样本数)，没有历史时返回 None"""
+        rows = self.conn.execute(
+            "SELECT seconds FROM timings WHERE suite = ? AND case_hash = ? AND kind = ? AND run_id < ? "
+            "ORDER BY run_id DESC LIMIT ?", (suite, case_hash, kind, self.run_id, self.window)).fetchall()
+        if not rows:
+            return None
+        import statistics
+        samples = [row[0] for row in rows]
+        median = statistics.median(samples)
+        # 中位数绝对偏差换算为正态分布下的标准差估计
+        sigma = 1.4826 * statistics.median(abs(x - median) for x in samples)
+        return median, sigma, len(samples)
+    
+    def compare(self, seconds: float, baseline) -> int:
+        """与基线比较：1 表示回退，-1 表示提升，0 表示在噪声范围内"""
+        median, sigma, _ = baseline
+        margin = max(self.threshold * median, self.noise_factor * sigma, self.min_delta)
+        if seconds - median > margin:
+            return 1
+        if median - seconds > margin:
+            return -1
+        return 0
+    
+    def record(self, suite: str, case_hash: str, kind: str, solution_hash: str, seconds: float):
+        self.conn.execute("INSERT INTO timings VALUES (?, ?, ?, ?, ?, ?)",
+                          (suite, case_hash, kind, self.run_id, solution_hash, seconds))
+    
+    def commit(self):
+        if self.conn is not None:
+            self.conn.commit()
+    
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+# 解决方案模块的预置名称（首次使用时构建）和已编译的解决方案代码（按文件名和内容哈希）
+_solution_prelude = None
+_compiled_solutions = {}
+
+def solution_prelude() -> Dict:
+    """LeetCode 环境中无需导入即可使用的名称，以及 TreeNode / ListNode"""
+    global _solution_prelude
+    if _solution_prelude is None:
+        import builtins, typing, collections, bisect, itertools, functools, json, random, string
+        prelude = {}
+        # 相当于 from <module> import *（typing 在前，同名时 collections.Counter 等优先），
+        # 但不覆盖内置函数，如 math.pow 不会替换三参数的 pow
+        for module in (typing, collections, heapq, bisect, itertools, functools, math, string, operator):
+            names = getattr(module, '__all__', None) or [name for name in vars(module) if not name.startswith('_')]
+            prelude.update((name, getattr(module, name)) for name in names
+                           if not hasattr(builtins, name) and hasattr(module, name))
+        for module in (collections, bisect, itertools, functools, heapq, math, re, operator,
+                       sys, json, string, random, typing):
+            prelude[module.__name__] = module
+        prelude.update(TreeNode=TreeNode, ListNode=ListNode)
+        _solution_prelude = prelude
+    return _solution_prelude
+
+def new_solution_module(source: str, filename: str) -> types.ModuleType:
+    """为解决方案创建独立的模块对象并注册到 sys.modules（dataclass、类型注解解析需要）"""
+    # 名称由内容决定，工作进程与主进程中同一份代码得到同名模块，其中定义的对象可以跨进程 pickle
+    digest = zlib.crc32(f"{filename}\0{source}".encode('utf-8'))
+    module = types.ModuleType(f"lutf_solution_{digest:08x}")
+    module.__file__ = filename
+    module.__dict__.update(solution_prelude())
+    sys.modules[module.__name__] = module
+    return module
+
+# 代码对象标志位（与 inspect.CO_VARARGS / inspect.CO_VARKEYWORDS 相同）
+CO_VARARGS = 0x04
+CO_VARKEYWORDS = 0x08
+
+def static_class_attr(cls: type, name: str):
+    """按 MRO 取类属性的原始对象（不触发描述符协议），相当于 inspect.getattr_static"""
+    for klass in cls.__mro__:
+        if name in vars(klass):
+            return vars(klass)[name]
+    return None
+
+def parameter_names(func) -> List[str]:
+    """函数的参数名列表；普通函数直接读代码对象，装饰过的可调用对象才导入 inspect"""
+    if type(func) is types.FunctionType and not hasattr(func, '__wrapped__'):
+        code = func.__code__
+        names = code.co_varnames
+        positional = list(names[:code.co_argcount])
+        keyword_only = list(names[code.co_argcount:code.co_argcount + code.co_kwonlyargcount])
+        rest = iter(names[code.co_argcount + code.co_kwonlyargcount:])
+        # 签名顺序：位置参数、*args、仅关键字参数、**kwargs
+        varargs = [next(rest)] if code.co_flags & CO_VARARGS else []
+        varkw = [next(rest)] if code.co_flags & CO_VARKEYWORDS else []
+        return positional + varargs + keyword_only + varkw
+    import inspect
+    return list(inspect.signature(func).parameters)
+
+# 类型表达式：(名称, 参数元组)，如 Optional[List[int]] -> ('Optional', (('List', (('int', ()),)),))
+TYPE_TOKEN_RE = re.compile(r"[A-Za-z_][\w.]*|[\[\],|]|[^\s'\"]")
+TYPE_NAME_ALIASES = {'list': 'List', 'NoneType': 'None'}
+NONE_TYPE = ('None', ())
+
+def make_type_expr(name: str, args: List) -> tuple:
+    """构造类型表达式：去掉模块前缀，Union[X, None] 规范为 Optional[X]"""
+    name = name.rpartition('.')[2]
+    name = TYPE_NAME_ALIASES.get(name, name)
+    if name in ('Optional', 'Union'):
+        options = [arg for arg in args if arg != NONE_TYPE]
+        if len(options) == 1:
+            return ('Optional', (options[0],)) if name == 'Optional' or len(options) < len(args) else options[0]
+    return (name, tuple(args))
+
+def parse_type_exprs(text: str) -> tuple:
+    """解析逗号分隔的类型表达式字符串：Optional[TreeNode],List[int]，也接受 ListNode | None 的写法"""
+    tokens = TYPE_TOKEN_RE.findall(text)
+    pos = 0
+    
+    def parse_union():
+        options = [parse_atom()]
+        while pos < len(tokens) and tokens[pos] == '|':
+            advance()
+            options.append(parse_atom())
+        return options[0] if len(options) == 1 else make_type_expr('Union', options)
+    
+    def parse_atom():
+        name = advance()
+        if not (name[0].isalpha() or name[0] == '_'):
+            raise ValueError(f"Invalid type expression: {text!r}")
+        args = []
+        if pos < len(tokens) and tokens[pos] == '[':
+            advance()
+            args.append(parse_union())
+            while tokens[pos:pos + 1] == [',']:
+                advance()
+                args.append(parse_union())
+            if advance() != ']':
+                raise ValueError(f"Invalid type expression: {text!r}")
+        return make_type_expr(name, args)
+    
+    def advance():
+        nonlocal pos
+        if pos >= len(tokens):
+            raise ValueError(f"Invalid type expression: {text!r}")
+        pos += 1
+        return tokens[pos - 1]
+    
+    exprs = [parse_union()]
+    while pos < len(tokens) and tokens[pos] == ',':
+        advance()
+        exprs.append(parse_union())
+    if pos != len(tokens):
+        raise ValueError(f"Invalid type expression: {text!r}")
+    return tuple(exprs)
+
+def annotation_expr(annotation) -> tuple:
+    """把类型注解（字符串、类或 typing 泛型）转换为类型表达式，不导入 typing"""
+    if isinstance(annotation, str):
+        exprs = parse_type_exprs(annotation)
+        if len(exprs) != 1:
+            raise ValueError(f"Invalid type expression: {annotation!r}")
+        return exprs[0]
+    if annotation is None:
+        return NONE_TYPE
+    forward = getattr(annotation, '__forward_arg__', None)
+    if forward is not None:  # typing.ForwardRef，如 Optional['Node']
+        return annotation_expr(forward)
+    args = getattr(annotation, '__args__', None)
+    if args is not None and not isinstance(annotation, type):
+        origin = getattr(annotation, '__origin__', None)
+        # X | None（types.UnionType）没有 __origin__
+        name = 'Union' if origin is None else getattr(origin, '_name', None) or getattr(origin, '__name__', '')
+        return make_type_expr(name, [annotation_expr(arg) for arg in args])
+    return make_type_expr(getattr(annotation, '__name__', repr(annotation)), [])
+
+class CallPlan:
+    """函数类题目的调用计划：方法、参数、参数转换器和结果序列化函数只解析一次，所有用例复用"""
+    def __init__(self, solution_class: type, method_name: str, params: List[str],
+                 converters: List, reuse_instance: bool = False, schema: Optional[tuple] = None,
+                 serialize_result=None, serialize_input=None):
+        self.solution_class = solution_class
+        self.method_name = method_name
+        self.params = params
+        self.converters = converters
+        # 计划基于哪个 input.txt schema 解析（None 表示只用类型注解）
+        self.schema = schema
+        # 返回值的序列化函数；原地修改的题目（返回 None）改为序列化第一个参数
+        self.serialize_result = serialize_result
+        self.serialize_input = serialize_input
+        self.instance = solution_class() if reuse_instance else None
+        # 使用 __slots__ 的实例无法通过 __dict__ 判断是否有状态，每个用例新建实例
+        if getattr(self.instance, '__dict__', None) is None:
+            self.instance = None
+        self.bound_method = getattr(self.instance, method_name) if self.instance is not None else None
+    
+    def bind(self):
+        """返回本次调用使用的绑定方法"""
+        if self.instance is not None:
+            # 实例上出现了属性说明解决方案有状态，改为每个用例新建实例
+            if not self.instance.__dict__:
+                return self.bound_method
+            self.instance = self.bound_method = None
+        return getattr(self.solution_class(), self.method_name)
+    
+    def build_args(self, case_data: List) -> List:
+        """按预先解析的转换器构造参数，多出的参数原样传入"""
+        converters = self.converters
+        return [converters[i](value) if i < len(converters) and converters[i] else value
+                for i, value in enumerate(case_data)]
+
+class FileWatcher:
+    """监视一组文件的变化：Linux 上使用 inotify，其他平台退回轮询"""
+    # inotify 事件掩码：写入完成、移动到目录中（编辑器原子保存）、新建、删除
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    EVENT_HEADER = struct.Struct('iIII')
+    
+    def __init__(self, paths: List[str], interval: float = 0.5, debounce: float = 0.1):
+        self.paths = {os.path.abspath(path) for path in paths}
+        self.interval = interval
+        self.debounce = debounce
+        self.signatures = {path: self.signature(path) for path in self.paths}
+        self.inotify_fd = None
+        self.watch_dirs = {}
+        self.init_inotify()
+    
+    @staticmethod
+    def signature(path: str):
+        """文件的 (mtime_ns, size)，文件不存在时为 None"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def init_inotify(self):
+        """尝试通过 ctypes 使用 inotify，失败时保持轮询模式"""
+        if not sys.platform.startswith('linux'):
+            return
+        try:
+            import ctypes
+            import ctypes.util
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return
+            mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE
+            # 监视所在目录，编辑器先写临时文件再重命名时也能收到事件
+            for directory in {os.path.dirname(path) for path in self.paths}:
+                wd = libc.inotify_add_watch(fd, directory.encode(), mask)
+                if wd >= 0:
+                    self.watch_dirs[wd] = directory
+            if self.watch_dirs:
+                self.inotify_fd = fd
+            else:
+                os.close(fd)
+        except (OSError, AttributeError):
+            self.inotify_fd = None
+    
+    @property
+    def backend(self) -> str:
+        return 'inotify' if self.inotify_fd is not None else 'polling'
+    
+    def drain_inotify(self, timeout: Optional[float]) -> bool:
+        """等待并读取 inotify 事件，返回是否有被监视的文件发生变化"""
+        import select
+        ready, _, _ = select.select([self.inotify_fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            data = os.read(self.inotify_fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        
+        touched = False
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, _, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0').decode(errors='replace')
+            offset += length
+            if os.path.join(self.watch_dirs.get(wd, ''), name) in self.paths:
+                touched = True
+        return touched
+    
+    def changed_paths(self):
+        """对比文件签名，返回内容可能变化的文件集合"""
+        changed = set()
+        for path in self.paths:
+            signature = self.signature(path)
+            if signature != self.signatures[path]:
+                self.signatures[path] = signature
+                changed.add(path)
+        return changed
+    
+    def wait(self):
+        """阻塞直到有文件变化，返回变化的文件集合"""
+        while True:
+            if self.inotify_fd is not None:
+                if not self.drain_inotify(None):
+                    continue
+                # 合并一次保存产生的多个事件
+                while self.drain_inotify(self.debounce):
+                    pass
+            else:
+                time.sleep(self.interval)
+            
+            changed = self.changed_paths()
+            if changed:
+                return changed
+
+def case_verdict(success: bool, result: Any) -> str:
+    """用例判定：PASS / WA / TLE / MLE / RE"""
+    if success:
+        return 'PASS'
+    if isinstance(result, LimitExceeded):
+        return 'TLE' if result.verdict == LimitExceeded.TLE else 'MLE'
+    if isinstance(result, str) and result.startswith(("Runtime error:", "Invalid output:",
+                                                      "No method found", "No solution class found")):
+        return 'RE'
+    return 'WA'
+
+class CaseGenerator:
+    """按规格随机生成用例，每个参数一个规格，用分号分隔
+
+    规格示例：
+      int(-10^9..10^9)                 整数
+      int[1..100](-10^9..10^9)         整数数组，长度 1..100
+      int[1..5][3](0..9)               二维整数矩阵，每行 3 个元素
+      float(0..1) / bool               浮点数 / 布尔值
+      str[1..20](abc)                  由 a/b/c 组成的字符串，默认 a-z
+      tree[0..50](-100..100)           二叉树（层序列表，含 null），最多 50 个节点
+    """
+    SPEC_RE = re.compile(r'^(int|float|bool|str|tree)((?:\[[^\]]*\])*)(?:\(([^)]*)\))?$')
+    DEFAULT_RANGES = {'int': (-100, 100), 'float': (-100.0, 100.0), 'tree': (-100, 100)}
+    
+    def __init__(self, spec: str):
+        self.spec = spec
+        self.params = [self.parse_param(part.strip()) for part in spec.split(';') if part.strip()]
+        if not self.params:
+            raise ValueError(f"Empty generator spec: {spec!r}")
+    
+    @staticmethod
+    def parse_number(text: str):
+        """解析 10^9、-10^9、1e5、42 等写法"""
+        text = text.strip().replace(' ', '')
+        sign = -1 if text.startswith('-') else 1
+        body = text.lstrip('+-')
+        if '^' in body:
+            base, _, exponent = body.partition('^')
+            return sign * int(base) ** int(exponent)
+        value = float(body) if any(c in body for c in '.eE') else int(body)
+        return sign * (int(value) if isinstance(value, float) and value.is_integer() else value)
+    
+    def parse_range(self, text: str):
+        lo, sep, hi = text.partition('..')
+        try:
+            # 单个数字表示固定值，如 int[3](0..9)
+            return (self.parse_number(lo), self.parse_number(hi if sep else lo))
+        except ValueError:
+            raise ValueError(f"Expected a range like 1..10, got {text!r} in {self.spec!r}") from None
+    
+    def parse_param(self, part: str):
+        match = self.SPEC_RE.match(part)
+        if not match:
+            raise ValueError(f"Invalid generator spec {part!r}")
+        kind, dims_text, arg = match.groups()
+        dims = [self.parse_range(d) for d in re.findall(r'\[([^\]]*)\]', dims_text)]
+        if kind == 'str':
+            values = arg or 'abcdefghijklmnopqrstuvwxyz'
+            dims = dims or [(1, 10)]
+        elif kind == 'bool':
+            values = None
+        else:
+            values = self.parse_range(arg) if arg else self.DEFAULT_RANGES[kind]
+        if kind == 'tree' and len(dims) != 1:
+            raise ValueError(f"tree spec needs exactly one size range: {part!r}")
+        return kind, dims, values
+    
+    def scalar(self, rng: random.Random, kind: str, values):
+        if kind == 'bool':
+            return rng.random() < 0.5
+        if kind == 'float':
+            return rng.uniform(*values)
+        return rng.randint(*values)
+    
+    def tree(self, rng: random.Random, size: int, values) -> List:
+        """随机形状的二叉树层序列表"""
+        if size <= 0:
+            return []
+        nodes = [rng.randint(*values)]
+        count, open_slots = 1, 2
+        while count < size:
+            # 只剩最后一个空位时必须放节点，保证能放满 size 个
+            if open_slots == 1 or rng.random() < 0.7:
+                nodes.append(rng.randint(*values))
+                count += 1
+                open_slots += 1
+            else:
+                nodes.append(None)
+                open_slots -= 1
+        return nodes
+    
+    def generate(self, rng: random.Random) -> List:
+        """生成一个用例的参数列表"""
+        case_data = []
+        for kind, dims, values in self.params:
+            if kind == 'tree':
+                case_data.append(self.tree(rng, rng.randint(*dims[0]), values))
+            elif kind == 'str':
+                length = rng.randint(*dims[0])
+                case_data.append(''.join(rng.choice(values) for _ in range(length)))
+            else:
+                # 多维数组每一维长度在用例内固定（矩形）
+                shape = [rng.randint(*d) for d in dims]
+                case_data.append(self.fill(rng, shape, kind, values))
+        return case_data
+    
+    def fill(self, rng: random.Random, shape: List[int], kind: str, values):
+        if not shape:
+            return self.scalar(rng, kind, values)
+        return [self.fill(rng, shape[1:], kind, values) for _ in range(shape[0])]
+    
+    def shrink_candidates(self, index: int, value):
+        """产出第 index 个参数比 value 更“小”且仍符合规格的候选值：先删除片段，再缩小单个元素"""
+        kind, dims, values = self.params[index]
+        if kind == 'tree':
+            yield from self.shrink_tree(value, dims[0][0], values)
+        elif kind == 'str':
+            yield from self.shrink_sequence(value, dims[0][0])
+            # 字符向字符集中的第一个字符收缩
+            for i, char in enumerate(value):
+                if char != values[0]:
+                    yield value[:i] + values[0] + value[i + 1:]
+        else:
+            yield from self.shrink_array(value, dims, kind, values)
+    
+    @staticmethod
+    def shrink_sequence(value, min_length: int):
+        """删除长度递减的片段，结果长度不小于 min_length"""
+        n = len(value)
+        size = min(n // 2 or n, n - min_length)
+        while size >= 1:
+            for start in range(0, n - size + 1, size):
+                yield value[:start] + value[start + size:]
+            size //= 2
+    
+    def shrink_array(self, value, dims: List, kind: str, values, outermost: bool = True):
+        """多维数组：删除最外层的片段（二维时也删除列），再逐个缩小元素；内层行长度不变，保持矩形"""
+        if not dims:
+            yield from self.shrink_scalar(value, kind, values)
+            return
+        if outermost:
+            yield from self.shrink_sequence(value, dims[0][0])
+            if len(dims) == 2 and value and len(value[0]) > dims[1][0]:
+                for j in range(len(value[0])):
+                    yield [row[:j] + row[j + 1:] for row in value]
+        for i, item in enumerate(value):
+            for smaller in self.shrink_array(item, dims[1:], kind, values, False):
+                yield value[:i] + [smaller] + value[i + 1:]
+    
+    def shrink_tree(self, nodes: List, min_size: int, values):
+        """层序列表：删除片段（节点数不少于 min_size），再缩小节点值"""
+        for candidate in self.shrink_sequence(nodes, 0):
+            if sum(node is not None for node in candidate) >= min_size:
+                yield candidate
+        for i, node in enumerate(nodes):
+            if node is not None:
+                for smaller in self.shrink_scalar(node, 'int', values):
+                    yield nodes[:i] + [smaller] + nodes[i + 1:]
+    
+    @staticmethod
+    def shrink_scalar(value, kind: str, values):
+        """标量向取值范围内最接近 0 的值收缩（范围不含 0 时即为端点）"""
+        if kind == 'bool':
+            if value:
+                yield False
+            return
+        lo, hi = values
+        target = min(max(0, lo), hi)
+        if kind == 'float':
+            target = float(target)
+            if value != target:
+                yield target
+            if value != round(value) and lo <= round(value) <= hi:
+                yield float(round(value))
+            return
+        if value == target:
+            return
+        yield target
+        if abs(value - target) > 1:
+            yield target + (value - target) // 2 if value > target else target - (target - value) // 2
+            yield value - 1 if value > target else value + 1
+
+class SamplingProfiler:
+    """基于 SIGPROF 的采样分析器：每隔 interval 秒 CPU 时间记录一次解决方案文件中的调用栈
+
+    实际采样间隔不小于内核时钟周期（通常 1-4ms），短于一个周期的调用可能没有采样。
+    """
+    def __init__(self, filename: str, interval: float = 1e-3):
+        self.filename = filename
+        self.interval = interval
+        # 折叠调用栈（火焰图格式）和最内层解决方案代码行的采样次数
+        self.stacks = defaultdict(int)
+        self.lines = defaultdict(int)
+        self.previous_handler = None
+        self.line_tables = {}
+    
+    def frame_line(self, frame) -> int:
+        """当前行号；信号在没有行号的指令（如循环的回跳）处送达时，取之前最近一条有行号的指令"""
+        if frame.f_lineno is not None:
+            return frame.f_lineno
+        code = frame.f_code
+        table = self.line_tables.get(code)
+        if table is None:
+            table = self.line_tables[code] = [(start, line) for start, _, line in code.co_lines()
+                                              if line is not None]
+        line = code.co_firstlineno
+        for start, candidate in table:
+            if start > frame.f_lasti:
+                break
+            line = candidate
+        return line
+    
+    def sample(self, signum, frame):
+        names = []
+        leaf = None
+        while frame is not None:
+            code = frame.f_code
+            if code.co_filename == self.filename:
+                if leaf is None:
+                    leaf = (self.frame_line(frame), code.co_name)
+                names.append(code.co_name)
+            frame = frame.f_back
+        if leaf is None:
+            return  # 当前不在解决方案代码中
+        self.stacks[';'.join(reversed(names))] += 1
+        self.lines[leaf] += 1
+    
+    def start(self):
+        self.previous_handler = signal.signal(signal.SIGPROF, self.sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+    
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self.previous_handler or signal.SIG_DFL)
+
+class ValueSummarizer(reprlib.Repr):
+    """有界的值摘要：大数组只格式化前几个元素，耗时与输入规模无关"""
+    def __init__(self, limit: int = 200):
+        super().__init__()
+        self.limit = limit
+        self.maxlevel = 4
+        self.maxlist = self.maxtuple = self.maxset = self.maxdict = 20
+        self.maxstring = self.maxother = limit
+    
+    def repr_array(self, value, level):
+        # array('q') 按列表格式摘要
+        return self.repr_list(value, level)
+    
+    def summarize(self, value: Any) -> str:
+        text = self.repr(value)
+        return text if len(text) <= self.limit else text[:self.limit - 3] + '...'
+
+class StructuralDiff:
+    """线性时间、输出有界的结构化 diff：列表、字典和字符串只显示差异附近的窗口"""
+    def __init__(self, colorize, context: int = 3, max_hunks: int = 3, max_depth: int = 4):
+        self.colorize = colorize
+        # 每处差异前后显示 context 个元素，最多显示 max_hunks 处差异
+        self.context = context
+        self.max_hunks = max_hunks
+        self.max_depth = max_depth
+        self.summarizer = ValueSummarizer(40)
+    
+    def render(self, expected: Any, actual: Any) -> str:
+        lines = []
+        self.diff(expected, actual, '', lines, 0)
+        return "\n".join(lines)
+    
+    def diff(self, expected: Any, actual: Any, path: str, lines: List[str], depth: int):
+        """按类型分派；类型不同或到达最大深度时给出两边的摘要（标量完整显示）"""
+        if depth < self.max_depth:
+            if isinstance(expected, (list, tuple)) and isinstance(actual, (list, tuple)):
+                return self.diff_sequence(expected, actual, path, lines, depth)
+            if isinstance(expected, dict) and isinstance(actual, dict):
+                return self.diff_dict(expected, actual, path, lines, depth)
+            if isinstance(expected, str) and isinstance(actual, str):
+                return self.diff_string(expected, actual, path, lines)
+        lines.append(f"{self.colorize('At', 'cyan')} {path or 'value'}:")
+        lines.append(f"  {self.colorize('Expected:', 'cyan')} {self.colorize(self.describe(expected), 'green')}")
+        lines.append(f"  {self.colorize('Actual:  ', 'cyan')} {self.colorize(self.describe(actual), 'red')}")
+    
+    def describe(self, value: Any) -> str:
+        """容器给出有界摘要；字符串、数字等标量（如运行错误信息）完整显示"""
+        if isinstance(value, (list, tuple, dict, set, array)) or type(value).__module__ == 'numpy':
+            return self.summarizer.summarize(value)
+        return repr(value)
+    
+    def diff_sequence(self, expected, actual, path: str, lines: List[str], depth: int):
+        common = min(len(expected), len(actual))
+        # 逐元素比较在 C 层完成，只保留前 max_hunks 个差异位置
+        flags = list(map(operator.ne, expected[:common], actual[:common]))
+        differing = flags.count(True)
+        indices = list(islice(compress(range(common), flags), self.max_hunks))
+        del flags
+        
+        where = path or 'value'
+        if len(expected) != len(actual):
+            lines.append(f"{self.colorize('Length', 'cyan')} of {where}: expected {len(expected)}, "
+                         f"actual {self.colorize(str(len(actual)), 'red')}")
+        if differing:
+            lines.append(f"{self.colorize(str(differing), 'red')} of {common} positions differ in {where}, "
+                         f"first at index {indices[0]}")
+        elif len(expected) != len(actual):
+            lines.append(f"First {common} elements are equal")
+            indices = [common]
+        
+        first = indices[0] if indices else None
+        if (first is not None and first < common and
+                self.is_container(expected[first]) and type(expected[first]) is type(actual[first])):
+            # 首个差异是嵌套结构时深入一层，定位到最内层的差异
+            self.diff(expected[first], actual[first], f"{path}[{first}]", lines, depth + 1)
+            indices = indices[1:]
+        for lo, hi in self.windows(indices, max(len(expected), len(actual))):
+            lines.append(self.colorize(f"  @ {path}[{lo}:{hi}]", 'cyan'))
+            lines.append(f"  {self.colorize('Expected:', 'cyan')} {self.render_window(expected, actual, lo, hi, 'green')}")
+            lines.append(f"  {self.colorize('Actual:  ', 'cyan')} {self.render_window(actual, expected, lo, hi, 'red')}")
+        if differing > self.max_hunks:
+            lines.append(f"  ... {differing - self.max_hunks} more differing positions")
+    
+    def diff_dict(self, expected: Dict, actual: Dict, path: str, lines: List[str], depth: int):
+        missing = [key for key in expected if key not in actual]
+        extra = [key for key in actual if key not in expected]
+        changed = [key for key in expected if key in actual and expected[key] != actual[key]]
+        where = path or 'value'
+        for label, keys in (('Missing keys', missing), ('Unexpected keys', extra), ('Changed keys', changed)):
+            if keys:
+                shown = ', '.join(self.summarizer.summarize(key) for key in keys[:self.max_hunks * 2])
+                more = f", ... ({len(keys)} total)" if len(keys) > self.max_hunks * 2 else ""
+                lines.append(f"{self.colorize(label, 'cyan')} in {where}: {shown}{more}")
+        for key in changed[:self.max_hunks]:
+            self.diff(expected[key], actual[key], f"{path}[{key!r}]", lines, depth + 1)
+    
+    def diff_string(self, expected: str, actual: str, path: str, lines: List[str]):
+        # 二分查找最长公共前缀，切片比较在 C 层完成，总代价线性
+        lo, hi = 0, min(len(expected), len(actual))
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if expected[lo:mid] == actual[lo:mid]:
+                lo = mid
+            else:
+                hi = mid - 1
+        common = min(len(expected), len(actual))
+        differing = sum(map(operator.ne, expected[:common], actual[:common]))
+        where = path or 'value'
+        lines.append(f"{self.colorize('String', 'cyan')} {where}: lengths {len(expected)} / {len(actual)}, "
+                     f"{differing} differing characters, first at index {lo}")
+        start = max(0, lo - 20)
+        for label, text, color in (('Expected:', expected, 'green'), ('Actual:  ', actual, 'red')):
+            head = '...' if start else ''
+            tail = '...' if lo + 40 < len(text) else ''
+            # 去掉 repr 两侧的引号，只保留转义，整段再加一对引号
+            lines.append(f"  {self.colorize(label, 'cyan')} \"{head}{repr(text[start:lo])[1:-1]}"
+                         f"{self.colorize(repr(text[lo:lo + 40])[1:-1], color)}{tail}\"")
+    
+    def windows(self, indices: List[int], length: int):
+        """差异位置前后各扩展 context 个元素，重叠的窗口合并"""
+        merged = []
+        for index in indices:
+            lo, hi = max(0, index - self.context), min(length, index + self.context + 1)
+            if merged and lo <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], hi)
+            else:
+                merged.append([lo, hi])
+        return merged
+    
+    def render_window(self, values, other, lo: int, hi: int, color: str) -> str:
+        """显示 values[lo:hi]，与 other 不同的元素着色"""
+        parts = ['...'] if lo > 0 else []
+        for i in range(lo, min(hi, len(values))):
+            text = self.summarizer.summarize(values[i])
+            if i >= len(other) or values[i] != other[i]:
+                text = self.colorize(text, color)
+            parts.append(text)
+        if hi < len(values):
+            parts.append('...')
+        return '[' + ', '.join(parts) + ']'
+    
+    @staticmethod
+    def is_container(value: Any) -> bool:
+        return isinstance(value, (list, tuple, dict, str))
+
+def hashable_key(value):
+    """把列表、字典、集合递归转换为可哈希的等价键"""
+    if isinstance(value, (list, tuple)):
+        key = tuple(value)
+        try:
+            hash(key)
+            return key
+        except TypeError:
+            return tuple(map(hashable_key, value))
+    if isinstance(value, dict):
+        return frozenset((k, hashable_key(v)) for k, v in value.items())
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+class ResultComparator:
+    """结果比较方式：exact、unordered[:N]（哈希多重集）、sorted[:N]（规范化排序），可叠加浮点容差和校验函数"""
+    MODES = ('exact', 'unordered', 'sorted')
+    
+    def __init__(self, spec: str = 'exact', tolerance: Optional[float] = None, validator=None):
+        self.mode, self.depth = self.parse_spec(spec)
+        self.tolerance = tolerance
+        # validate(args, expected, actual) -> bool，接受任意合法答案
+        self.validator = validator
+    
+    @classmethod
+    def parse_spec(cls, spec: str):
+        """'unordered:2' -> ('unordered', 2)；N 为从最外层起忽略顺序的列表层数，默认 1"""
+        mode, _, depth = spec.partition(':')
+        if mode not in cls.MODES or (depth and not depth.isdigit()) or depth == '0':
+            raise ValueError(f"Unknown compare mode '{spec}' (expected exact, unordered[:N] or sorted[:N])")
+        return mode, int(depth or 1)
+    
+    def match(self, actual: Any, expected: Any, args: Optional[List] = None) -> bool:
+        """函数类题目的判定：先做一次 C 层的 ==，不相等时才交给校验函数或按比较方式判断"""
+        if actual == expected:
+            return True
+        if self.validator is not None:
+            return bool(self.validator(args, expected, actual))
+        return self.equivalent(actual, expected)
+    
+    def equivalent(self, actual: Any, expected: Any) -> bool:
+        """按比较方式和容差判断两个值是否等价（调用方已确认 actual != expected）"""
+        if self.mode == 'unordered' and self.tolerance is None:
+            return self.same_multiset(actual, expected, self.depth)
+        if self.mode != 'exact':
+            # 带容差的值不能哈希，忽略顺序时退化为规范化排序后逐个比较
+            actual = self.canonical_sort(actual, self.depth)
+            expected = self.canonical_sort(expected, self.depth)
+            if self.tolerance is None:
+                return actual == expected
+        return self.tolerance is not None and self.close(actual, expected)
+    
+    def same_multiset(self, actual: Any, expected: Any, depth: int) -> bool:
+        """长度不同直接判否，否则比较两边元素规范键的计数，哈希实现，线性时间"""
+        if not isinstance(actual, list) or not isinstance(expected, list) or len(actual) != len(expected):
+            return False
+        if depth == 1:
+            try:
+                return self.same_counts(actual, expected)
+            except TypeError:
+                pass  # 元素不可哈希（如嵌套列表）
+            # 常见情形：元素是平坦列表（如排列），在 C 层转换为元组
+            if all(type(value) is list for value in actual) and all(type(value) is list for value in expected):
+                try:
+                    return self.same_counts(map(tuple, actual), map(tuple, expected))
+                except TypeError:
+                    pass
+        return self.same_counts((self.multiset_key(value, depth - 1) for value in actual),
+                                (self.multiset_key(value, depth - 1) for value in expected))
+    
+    @staticmethod
+    def same_counts(actual_keys, expected_keys) -> bool:
+        # Counter 自身的 == 逐键在 Python 层比较；计数中没有零，直接按 dict 比较
+        return dict.__eq__(Counter(actual_keys), Counter(expected_keys))
+    
+    def multiset_key(self, value: Any, depth: int):
+        """与外层 depth 层列表顺序无关的可哈希键：每个内层列表只排序一次，元素不可排序时改用计数"""
+        if depth <= 0 or not isinstance(value, list):
+            return hashable_key(value)
+        if depth == 1:
+            try:
+                key = tuple(sorted(value))
+                hash(key)
+                return key
+            except TypeError:
+                pass  # 元素不可排序或不可哈希
+        keys = [self.multiset_key(item, depth - 1) for item in value]
+        try:
+            return tuple(sorted(keys))
+        except TypeError:
+            return frozenset(Counter(keys).items())
+    
+    def canonical_sort(self, value: Any, depth: int):
+        """对外层 depth 层列表递归排序，得到与顺序无关的规范形式"""
+        if depth <= 0 or not isinstance(value, list):
+            return value
+        items = list(value) if depth == 1 else [self.canonical_sort(item, depth - 1) for item in value]
+        try:
+            items.sort()
+        except TypeError:
+            items.sort(key=repr)  # 元素之间不可比较（如混有 None）
+        return items
+    
+    def close(self, actual: Any, expected: Any) -> bool:
+        """递归比较，数值按相对和绝对容差均为 tolerance 的 math.isclose 比较"""
+        if isinstance(actual, float) or isinstance(expected, float):
+            numbers = (int, float)
+            if (isinstance(actual, numbers) and isinstance(expected, numbers) and
+                    not isinstance(actual, bool) and not isinstance(expected, bool)):
+                return math.isclose(actual, expected, rel_tol=self.tolerance, abs_tol=self.tolerance)
+            return False
+        if isinstance(actual, list) and isinstance(expected, list):
+            return len(actual) == len(expected) and all(map(self.close, actual, expected))
+        if isinstance(actual, dict) and isinstance(expected, dict):
+            return actual.keys() == expected.keys() and all(self.close(actual[k], expected[k]) for k in expected)
+        return actual == expected
+
+class JsonLinesReporter:
+    """逐用例写出 JSON Lines 报告，每行写完立即 flush"""
+    def __init__(self, stream, suite_name: str, truncate: int = 200):
+        self.stream = stream
+        self.suite_name = suite_name
+        self.summarizer = ValueSummarizer(truncate)
+    
+    def case(self, case_num: int, case_data: List, expected: Any, actual: Any,
+             success: bool, execution_time: float, metrics: Dict):
+        summarize = self.summarizer.summarize
+        memory = metrics.get('memory')
+        record = {
+            'type': 'case',
+            'suite': self.suite_name,
+            'case': case_num,
+            'verdict': case_verdict(success, actual),
+            'time': execution_time,
+            'peak_memory': memory['peak'] if memory else None,
+            'input': summarize(list(case_data)),
+            'expected': summarize(expected),
+            'actual': summarize(actual),
+        }
+        if 'bench' in metrics:
+            record['bench'] = metrics['bench']
+        self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.stream.flush()
+    
+    def summary(self, passed: int, total: int):
+        record = {'type': 'summary', 'suite': self.suite_name, 'passed': passed,
+                  'failed': total - passed, 'total': total}
+        self.stream.write(json.dumps(record) + '\n')
+        self.stream.flush()
+    
+    def close(self):
+        pass
+
+class JUnitReporter:
+    """逐用例写出 JUnit XML 报告；用例数在开始时未知，因此 testsuite 上不写计数属性"""
+    def __init__(self, stream, suite_name: str, truncate: int = 200):
+        from xml.sax.saxutils import escape, quoteattr
+        self.escape, self.quoteattr = escape, quoteattr
+        self.stream = stream
+        self.suite_name = suite_name
+        self.summarizer = ValueSummarizer(truncate)
+        self.stream.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n'
+                          f'  <testsuite name={quoteattr(suite_name)}>\n')
+        self.stream.flush()
+    
+    def case(self, case_num: int, case_data: List, expected: Any, actual: Any,
+             success: bool, execution_time: float, metrics: Dict):
+        summarize = self.summarizer.summarize
+        quoteattr = self.quoteattr
+        verdict = case_verdict(success, actual)
+        lines = [f'    <testcase classname={quoteattr(self.suite_name)} name="case {case_num}" '
+                 f'time="{execution_time:.6f}">']
+        if verdict != 'PASS':
+            tag = 'error' if verdict == 'RE' else 'failure'
+            body = (f"input: {summarize(list(case_data))}\nexpected: {summarize(expected)}\n"
+                    f"actual: {summarize(actual)}")
+            lines.append(f'      <{tag} type="{verdict}" message={quoteattr(summarize(actual))}>'
+                         f'{self.escape(body)}</{tag}>')
+        memory = metrics.get('memory')
+        if memory:
+            lines.append(f'      <system-out>peak_memory={memory["peak"]}</system-out>')
+        if len(lines) == 1:
+            lines[0] = lines[0][:-1] + '/>'
+        else:
+            lines.append('    </testcase>')
+        self.stream.write('\n'.join(lines) + '\n')
+        self.stream.flush()
+    
+    def summary(self, passed: int, total: int):
+        pass
+    
+    def close(self):
+        self.stream.write('  </testsuite>\n</testsuites>\n')
+        self.stream.flush()
+
+REPORTERS = {'jsonl': JsonLinesReporter, 'junit': JUnitReporter}
+
+class ProgressLine:
+    """终端中原地刷新的单行进度：已完成数、通过 / 失败数、吞吐量和预计剩余时间"""
+    def __init__(self, total: Optional[int], colorize, stream=None, interval: float = 0.1):
+        self.total = total
+        self.colorize = colorize
+        self.stream = stream or sys.stdout
+        # 输出不是终端时不显示（\r 刷新会在日志文件里留下大量重复行）
+        self.enabled = self.stream.isatty()
+        self.interval = interval
+        self.start = time.perf_counter()
+        self.last_draw = 0.0
+        self.visible = False
+        self.passed = 0
+        self.failed = 0
+    
+    def update(self, success: bool):
+        if success:
+            self.passed += 1
+        else:
+            self.failed += 1
+        now = time.perf_counter()
+        if self.enabled and now - self.last_draw >= self.interval:
+            self.last_draw = now
+            self.draw()
+    
+    def render(self) -> str:
+        done = self.passed + self.failed
+        elapsed = time.perf_counter() - self.start
+        rate = done / elapsed if elapsed > 0 else 0.0
+        parts = [f"[{done}/{self.total}]" if self.total is not None else f"[{done}]",
+                 self.colorize(f"✓ {self.passed}", 'green'),
+                 self.colorize(f"✗ {self.failed}", 'red' if self.failed else 'green'),
+                 f"{rate:.1f} cases/s"]
+        if self.total is not None and rate > 0:
+            eta = (self.total - done) / rate
+            parts.append(f"ETA {int(eta // 60)}m{int(eta % 60):02d}s" if eta >= 60 else f"ETA {eta:.1f}s")
+        return "  ".join(parts)
+    
+    def draw(self):
+        self.stream.write("\r\x1b[K" + self.render())
+        self.stream.flush()
+        self.visible = True
+    
+    def clear(self):
+        """擦掉进度行，之后的普通输出从行首开始"""
+        if self.visible:
+            self.stream.write("\r\x1b[K")
+            self.stream.flush()
+            self.visible = False
+
 class LeetCodeTester:
     def __init__(self):
         self.solution_code = ""
         self.solution_class = None
+        self.solution_module = None
+        # --class / --method：显式指定要测试的类和方法，None 表示自动选择
+        self.target_class = None
+        self.target_method = None
         self.test_cases = []
         self.expected_outputs = []
+        # 整数数组紧凑模式：None / 'array' / 'numpy'
+        self.int_array_mode = None
+        # 并行运行的进程数（1 表示串行）
+        self.jobs = 1
+        # 全局资源限制（timeout / cpu_time / memory_mb），单个用例可覆盖
+        self.limits = {}
+        # 基准测试选项（warmup / repeat / min_time / disable_gc），为空表示不做基准测试
+        self.bench = {}
+        # 无状态的解决方案可在用例间复用同一个实例
+        self.reuse_instance = False
+        self.call_plan = None
+        # (解决方案模块, 节点类 -> 节点类型)：序列化结果时识别解决方案自己定义的节点类
+        self.result_node_types = None
+        # 解决方案文件路径（用于编译后的文件名）和可选的磁盘缓存
+        self.solution_file = None
+        self.cache = None
+        # 内存分析：每个用例报告的分配位置数量，0 表示关闭（默认无额外开销）
+        self.memory_top = 0
+        # 本次运行的汇总统计（最慢用例、内存峰值等）
+        self.run_stats = {}
+        # 机器可读报告（--format jsonl / junit），None 表示不输出
+        self.reporter = None
+        # 设计类题目：已解析的方法缓存；逐操作计时时报告的最慢操作数量，0 表示关闭
+        self.design_method_cache = {}
+        self.op_stats_top = 0
+        # 性能分析（--profile）：None / 'cprofile' / 'sample'，汇总表行数和可选的导出文件
+        self.profile_mode = None
+        self.profile_top = 10
+        self.profile_out = None
+        # 性能历史（--history），None 表示不记录；fail_on_regression 时回退会导致运行失败
+        self.history = None
+        self.fail_on_regression = False
+        # 题目级比较方式（--compare / --tolerance / --validator），用例指令可覆盖；比较器按配置缓存
+        self.compare_mode = 'exact'
+        self.tolerance = None
+        self.validator_file = None
+        self.comparators = {}
+        # 逐用例结果块的打印范围（--show）：all / failed / none
+        self.show_cases = 'all'
+        # --progress：asyncio 调度工作进程并显示实时进度行；max_in_flight 为在途块数上限，0 表示 2*jobs
+        self.progress = False
+        self.max_in_flight = 0
         
     def colorize_text(self, text: str, color: str) -> str:
         """给文本添加颜色"""
@@ -86,6 +1545,15 @@ class LeetCodeTester:
     
     def create_colored_diff(self, expected: Any, actual: Any) -> str:
         """创建带颜色的diff输出"""
+        # 大的值使用结构化 diff，避免逐行格式化整个输出
+        if not (self.is_small_value(expected) and self.is_small_value(actual)):
+            # 只有两边是同类容器时才做有界 diff；类型不同或运行错误信息时直接给出两边（标量完整显示）
+            comparable = (type(expected) is type(actual) or
+                          isinstance(expected, (list, tuple)) and isinstance(actual, (list, tuple)))
+            if not comparable or case_verdict(False, actual) == 'RE':
+                return StructuralDiff(self.colorize_text, max_depth=0).render(expected, actual)
+            return StructuralDiff(self.colorize_text).render(expected, actual)
+        
         expected_str = self.format_value(expected)
         actual_str = self.format_value(actual)
         
@@ -111,8 +1579,25 @@ class LeetCodeTester:
         
         return "\n".join(diff_lines)
     
+    def is_small_value(self, value: Any, limit: int = 20) -> bool:
+        """值是否足够小（最多 limit 个元素/字符），可以完整格式化后逐字符比较；遍历有界"""
+        budget = limit
+        stack = [value]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, (list, tuple, dict)):
+                budget -= len(item)
+                stack.extend(item.values() if isinstance(item, dict) else item)
+            elif isinstance(item, str):
+                # 约 100 个字符以内的字符串仍使用字符级 diff
+                budget -= len(item) // 5
+            if budget < 0:
+                return False
+        return True
+    
     def create_inline_diff(self, expected: str, actual: str) -> str:
         """创建内联字符级diff"""
+        import difflib
         diff_result = []
         
         # 使用difflib进行字符级比较
@@ -144,12 +1629,28 @@ class LeetCodeTester:
         
         return "".join(diff_result)
     
+    def format_duration(self, seconds: float) -> str:
+        """格式化时长，自动选择 µs / ms / s 单位"""
+        if seconds < 1e-3:
+            return f"{seconds * 1e6:.2f}µs"
+        elif seconds < 1:
+            return f"{seconds * 1000:.2f}ms"
+        return f"{seconds:.3f}s"
+    
     def print_test_result(self, case_num: int, case_data: List, expected: Any, 
-                         actual: Any, success: bool, execution_time: float):
+                         actual: Any, success: bool, execution_time: float,
+                         metrics: Optional[Dict] = None):
         """打印带颜色的测试结果"""
+        metrics = metrics or {}
         print(f"\n{self.colorize_text(f'Test Case {case_num}:', 'bright_yellow')}")
         print(f"{self.colorize_text('Input:', 'cyan')} {self.format_value(case_data)}")
         
+        # 基准测试模式下以中位数作为用例耗时
+        bench = metrics.get('bench')
+        if bench:
+            execution_time = bench['median']
+        memory = metrics.get('memory')
+        
         # 格式化执行时间
         if execution_time < 1:
             time_str = f"{execution_time * 1000:.2f}ms"
@@ -158,30 +1659,102 @@ class LeetCodeTester:
             time_str = f"{execution_time:.3f}s"
             time_color = 'red'
         
-        if success:
+        if isinstance(actual, LimitExceeded):
+            print(f"{self.colorize_text('Time:', 'cyan')} {self.colorize_text(time_str, time_color)}"
+                  f"{self.format_memory_suffix(memory)}")
+            print(f"{self.colorize_text('Result:', 'bright_red')} {self.colorize_text(f'✗ {actual!r}', 'bright_red')}")
+        elif success:
             print(f"{self.colorize_text('Output:', 'cyan')} {self.colorize_text(self.format_value(actual), 'green')}")
-            print(f"{self.colorize_text('Time:', 'cyan')} {self.colorize_text(time_str, time_color)}")
+            print(f"{self.colorize_text('Time:', 'cyan')} {self.colorize_text(time_str, time_color)}"
+                  f"{self.format_memory_suffix(memory)}")
             print(f"{self.colorize_text('Result:', 'bright_green')} {self.colorize_text('✓ PASS', 'bright_green')}")
         else:
             print(f"{self.colorize_text('Diff:', 'cyan')}")
             print(self.create_colored_diff(expected, actual))
-            print(f"{self.colorize_text('Time:', 'cyan')} {self.colorize_text(time_str, time_color)}")
+            mismatch = metrics.get('design', {}).get('mismatch')
+            if mismatch:
+                index, method_name, params = mismatch
+                print(f"{self.colorize_text('First mismatch:', 'cyan')} operation {index} "
+                      f"{self.colorize_text(f'{method_name}{params}', 'bright_red')}")
+            print(f"{self.colorize_text('Time:', 'cyan')} {self.colorize_text(time_str, time_color)}"
+                  f"{self.format_memory_suffix(memory)}")
             print(f"{self.colorize_text('Result:', 'bright_red')} {self.colorize_text('✗ FAIL', 'bright_red')}")
+        
+        if bench:
+            self.print_bench_stats(bench)
+        if memory and memory['top']:
+            self.print_allocation_sites(memory['top'])
+        op_stats = metrics.get('design', {}).get('stats')
+        if op_stats:
+            self.print_op_stats(op_stats)
+        profile = metrics.get('profile')
+        if profile:
+            self.print_profile(profile, 3)
+    
+    def print_op_stats(self, stats: Dict):
+        """打印设计类题目的逐操作耗时：每个方法的分位数和直方图，以及最慢的操作"""
+        fmt = self.format_duration
+        bars = ' ▁▂▃▄▅▆▇█'
+        print(self.colorize_text('Ops:', 'cyan'))
+        width = max(len(name) for name in stats['per_method'])
+        for method_name, info in sorted(stats['per_method'].items(), key=lambda item: -item[1]['total']):
+            histogram = info['histogram']
+            lo, hi = min(histogram), max(histogram)
+            peak = max(histogram.values())
+            # 每格是一个 2 的幂区间，首尾标出区间下界和上界
+            spark = ''.join(bars[-(-histogram.get(b, 0) * (len(bars) - 1) // peak)] for b in range(lo, hi + 1))
+            print(f"  {method_name:<{width}}  {info['count']:>7}×  total {fmt(info['total']):>9}  "
+                  f"p50 {fmt(info['p50']):>9}  p99 {fmt(info['p99']):>9}  max {fmt(info['max']):>9}  "
+                  f"{fmt((1 << (lo - 1)) / 1e9 if lo > 1 else 0)} {spark} {fmt((1 << hi) / 1e9)}")
+        slowest = ', '.join(f"#{index} {method_name}{params} {fmt(seconds)}"
+                            for seconds, index, method_name, params in stats['slowest'])
+        print(f"  {self.colorize_text('Slowest:', 'cyan')} {slowest}")
+    
+    def format_bytes(self, size: float) -> str:
+        """格式化字节数"""
+        for unit in ('B', 'KB', 'MB'):
+            if abs(size) < 1024:
+                return f"{size:.0f}{unit}" if unit == 'B' else f"{size:.1f}{unit}"
+            size /= 1024
+        return f"{size:.2f}GB"
+    
+    def format_memory_suffix(self, memory: Optional[Dict]) -> str:
+        """Time 行后面的内存峰值"""
+        if not memory:
+            return ""
+        return f"  {self.colorize_text('Peak:', 'cyan')} {self.format_bytes(memory['peak'])}"
+    
+    def print_allocation_sites(self, sites: List):
+        """打印解决方案文件中调用结束时仍占用内存最多的分配位置"""
+        print(self.colorize_text('Allocations:', 'cyan'))
+        for location, size, count in sites:
+            print(f"  {location}  {self.format_bytes(size)} in {count} blocks")
+    
+    def print_bench_stats(self, bench: Dict):
+        """打印基准测试统计"""
+        fmt = self.format_duration
+        print(f"{self.colorize_text('Bench:', 'cyan')} "
+              f"min {fmt(bench['min'])}  median {fmt(bench['median'])}  "
+              f"p95 {fmt(bench['p95'])}  stdev {fmt(bench['stdev'])}  "
+              f"({bench['repeat']} × {bench['loops']} loops"
+              f"{', gc off' if bench['gc_disabled'] else ''})")
     
     def print_summary(self, passed: int, total: int):
         """打印带颜色的总结"""
         print("\n" + "=" * 60)
-        if passed == total:
+        interrupted = self.run_stats.get('interrupted')
+        if passed == total and not interrupted:
             print(f"{self.colorize_text('🎉 All tests passed!', 'bright_green')} "
                   f"{self.colorize_text(f'({passed}/{total})', 'green')}")
         else:
             failed = total - passed
-            print(f"{self.colorize_text('Test Summary:', 'bright_yellow')}")
+            title = 'Partial Summary (interrupted):' if interrupted else 'Test Summary:'
+            print(f"{self.colorize_text(title, 'bright_yellow')}")
             print(f"  {self.colorize_text('✓ Passed:', 'green')} {passed}")
             print(f"  {self.colorize_text('✗ Failed:', 'red')} {failed}")
             print(f"  {self.colorize_text('Total:', 'cyan')} {total}")
             
-            success_rate = (passed / total) * 100
+            success_rate = (passed / total) * 100 if total else 0.0
             if success_rate >= 80:
                 color = 'green'
             elif success_rate >= 50:
@@ -190,81 +1763,350 @@ class LeetCodeTester:
                 color = 'red'
             print(f"  {self.colorize_text('Success Rate:', 'cyan')} "
                   f"{self.colorize_text(f'{success_rate:.1f}%', color)}")
+        self.print_run_stats()
         print("=" * 60)
+    
+    def reset_run_stats(self):
+        """开始新一轮运行前清空汇总统计"""
+        self.run_stats = {}
+        if self.history is not None:
+            self.history.start_run()
+            import hashlib
+            self.run_stats['history_solution'] = hashlib.sha256(self.solution_code.encode('utf-8')).hexdigest()
+            self.run_stats['regressions'] = []
+            self.run_stats['improvements'] = []
+    
+    def record_result(self, case_num: int, case_data: List, expected: Any, actual: Any,
+                      success: bool, execution_time: float, metrics: Dict):
+        """把单个用例的结果计入汇总统计和机器可读报告"""
+        if self.reporter is not None:
+            self.reporter.case(case_num, case_data, expected, actual, success, execution_time, metrics)
+        stats = self.run_stats
+        stats['total_time'] = stats.get('total_time', 0.0) + execution_time
+        if execution_time >= stats.get('max_time', (-1.0, 0))[0]:
+            stats['max_time'] = (execution_time, case_num)
+        memory = metrics.get('memory')
+        if memory and memory['peak'] >= stats.get('max_peak', (-1, 0))[0]:
+            stats['max_peak'] = (memory['peak'], case_num)
+        if self.history is not None and success:
+            self.record_history(case_num, case_data, expected, execution_time, metrics)
+        if 'profile' in metrics:
+            stats['profile'] = self.merge_profile(stats.get('profile'), metrics['profile'])
+    
+    def record_history(self, case_num: int, case_data: List, expected: Any,
+                       execution_time: float, metrics: Dict):
+        """与历史基线比较通过用例的耗时，并写入本次结果"""
+        # 基准测试的中位数和单次计时不可比，分开记录
+        if 'bench' in metrics:
+            kind, seconds = 'bench', metrics['bench']['median']
+        else:
+            kind, seconds = 'single', execution_time
+        suite = self.solution_file or ''
+        case_hash = metrics.get('case_hash') or self.case_fingerprint(case_data, expected)
+        baseline = self.history.baseline(suite, case_hash, kind)
+        if baseline is not None:
+            verdict = self.history.compare(seconds, baseline)
+            if verdict > 0 and kind == 'single':
+                # 单次计时容易受调度等偶发停顿影响，疑似回退时重新计时确认
+                seconds = min(seconds, self.retime_case(case_data, expected, metrics))
+                verdict = self.history.compare(seconds, baseline)
+            if verdict:
+                key = 'regressions' if verdict > 0 else 'improvements'
+                self.run_stats[key].append((case_num, baseline[0], seconds, baseline[2]))
+        self.history.record(suite, case_hash, kind, self.run_stats['history_solution'], seconds)
+    
+    def retime_case(self, case_data: List, expected: Any, metrics: Dict, repeat: int = 3) -> float:
+        """用运行前的输入快照重新运行用例若干次，返回最短耗时"""
+        import pickle
+        best = float('inf')
+        snapshot = metrics.get('case_snapshot')
+        for _ in range(repeat):
+            fresh = pickle.loads(snapshot) if snapshot else copy.deepcopy(case_data)
+            success, _, execution_time, _ = self.run_test_case(fresh, expected)
+            if success:
+                best = min(best, execution_time)
+        return best
+    
+    def finish_run(self, passed: int, total: int) -> bool:
+        """一轮运行结束：打印总结并写入报告，返回本轮是否成功"""
+        if self.history is not None:
+            self.history.commit()
+        self.print_summary(passed, total)
+        if self.profile_out and 'profile' in self.run_stats:
+            self.dump_profile(self.run_stats['profile'], self.profile_out)
+            print(self.colorize_text(f"📄 Profile written to {self.profile_out}", 'cyan'))
+        if self.reporter is not None:
+            self.reporter.summary(passed, total)
+        if self.fail_on_regression and self.run_stats.get('regressions'):
+            return False
+        return passed == total and not self.run_stats.get('interrupted')
+    
+    def print_run_stats(self):
+        """在总结中打印耗时和内存峰值（仅在启用内存分析时）以及性能回退"""
+        stats = self.run_stats
+        if 'max_peak' in stats:
+            max_time, time_case = stats['max_time']
+            max_peak, peak_case = stats['max_peak']
+            print(f"  {self.colorize_text('Time:', 'cyan')} total {self.format_duration(stats['total_time'])}, "
+                  f"max {self.format_duration(max_time)} (case {time_case})  "
+                  f"{self.colorize_text('Peak:', 'cyan')} {self.format_bytes(max_peak)} (case {peak_case})")
+        if 'regressions' in stats:
+            self.print_perf_changes(stats['regressions'], stats['improvements'])
+        if 'profile' in stats:
+            self.print_profile(stats['profile'], self.profile_top, 'Hotspots:')
+    
+    def print_perf_changes(self, regressions: List, improvements: List, limit: int = 5):
+        """打印与历史基线相比的回退和提升（按变化倍数排序，各最多 limit 条）"""
+        regressed = self.colorize_text(f"{len(regressions)} slower", 'red' if regressions else 'green')
+        improved = self.colorize_text(f"{len(improvements)} faster", 'green')
+        print(f"  {self.colorize_text('Perf vs history:', 'cyan')} {regressed}, {improved}")
+        for entries, mark, color in ((regressions, '▲', 'red'), (improvements, '▼', 'green')):
+            for case_num, median, seconds, samples in sorted(
+                    entries, key=lambda e: max(e[1], e[2]) / max(min(e[1], e[2]), 1e-9), reverse=True)[:limit]:
+                print(f"    {self.colorize_text(mark, color)} case {case_num}: "
+                      f"{self.format_duration(median)} → {self.format_duration(seconds)} "
+                      f"({seconds / median if median else float('inf'):.2f}×, baseline of {samples} samples)")
         
     def parse_solution_template(self, template_code: str):
         """解析题目模板，识别类型和方法"""
         self.solution_code = template_code
+        self.call_plan = None
+        self.solution_class = None
         
-        # 编译解决方案代码
+        # 每个解决方案载入到自己的模块对象中，多个解决方案可同时载入、互不影响
+        filename = self.solution_file or '<solution>'
+        module = new_solution_module(template_code, filename)
         try:
-            exec(self.solution_code, globals())
-            if 'Solution' in globals():
-                self.solution_class = globals()['Solution']
-            else:
-                # 查找其他类名（如MedianFinder等）
-                for name, obj in globals().items():
-                    if isinstance(obj, type) and name != 'TreeNode' and name != 'ListNode':
-                        self.solution_class = obj
-                        break
+            exec(self.compile_solution(self.solution_code), module.__dict__)
+            self.solution_class = self.select_solution_class(module)
         except Exception as e:
+            sys.modules.pop(module.__name__, None)
             print(f"Error compiling solution: {e}")
             return False
         
+        self.solution_module = module
         return True
     
-    def parse_input_file(self, input_file: str):
-        """解析输入文件"""
-        self.test_cases = []
-        try:
-            with open(input_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                
-            current_case = []
-            for line in lines:
+    def select_solution_class(self, module: types.ModuleType):
+        """确定要测试的类：--class 指定的类，否则 Solution，否则文件中定义的第一个类（如MedianFinder等）"""
+        if self.target_class:
+            cls = module.__dict__.get(self.target_class)
+            if not isinstance(cls, type):
+                raise ValueError(f"class {self.target_class!r} not found in solution")
+            return cls
+        
+        # 只考虑解决方案文件中定义的类（节点类除外），按定义顺序
+        node_classes = {node_type.class_name for node_type in NODE_TYPES.values()}
+        defined = [obj for name, obj in module.__dict__.items()
+                   if isinstance(obj, type) and obj.__module__ == module.__name__
+                   and name not in node_classes]
+        for cls in defined:
+            if cls.__name__ == 'Solution':
+                return cls
+        return defined[0] if defined else None
+    
+    def compile_solution(self, source: str):
+        """编译解决方案代码，同一进程内按内容复用代码对象，启用缓存时复用 marshal 后的代码对象"""
+        filename = self.solution_file or '<solution>'
+        memo_key = (filename, source)
+        code = _compiled_solutions.get(memo_key)
+        if code is not None:
+            return code
+        
+        if self.cache is None:
+            code = compile(source, filename, 'exec')
+        else:
+            import importlib.util
+            key = self.cache.make_key(importlib.util.MAGIC_NUMBER.hex(), *memo_key)
+            data = self.cache.load('code', key)
+            try:
+                code = marshal.loads(data) if data is not None else None
+            except (EOFError, ValueError, TypeError):
+                code = None  # 缓存损坏，重新编译
+            if code is None:
+                code = compile(source, filename, 'exec')
+                self.cache.store('code', key, marshal.dumps(code))
+        
+        _compiled_solutions[memo_key] = code
+        return code
+    
+    def load_test_files(self, input_file: str, output_file: str) -> bool:
+        """解析输入和期望输出文件，启用缓存时按内容哈希复用解析结果；返回是否命中缓存"""
+        if self.cache is not None:
+            import pickle
+            key = self.cache.make_key(self.cache.file_digest(input_file),
+                                      self.cache.file_digest(output_file), self.int_array_mode)
+            data = self.cache.load('cases', key)
+            if data is not None:
+                try:
+                    cases, self.expected_outputs = pickle.loads(data)
+                    self.test_cases = []
+                    for args, limits, compare, schema in cases:
+                        case_data = TestCase(args)
+                        case_data.limits = limits
+                        case_data.compare = compare
+                        case_data.schema = schema
+                        self.test_cases.append(case_data)
+                    return True
+                except Exception:
+                    pass  # 缓存损坏，重新解析
+        
+        parsed = self.parse_input_file(input_file)
+        parsed = self.parse_output_file(output_file) and parsed
+        
+        # 解析出错时只得到部分结果，不写入缓存，修正文件前每次都会重新报告错误
+        if self.cache is not None and parsed:
+            import pickle
+            # 只存普通列表，缓存不依赖本模块是作为脚本还是被导入运行
+            cases = [(list(case_data), getattr(case_data, 'limits', {}), getattr(case_data, 'compare', {}),
+                      getattr(case_data, 'schema', None))
+                     for case_data in self.test_cases]
+            self.cache.store('cases', key, pickle.dumps((cases, self.expected_outputs),
+                                                        protocol=pickle.HIGHEST_PROTOCOL))
+        return False
+    
+    def iter_input_cases(self, input_file: str):
+        """逐个产出输入文件中的测试用例（流式读取，不整体载入文件）"""
+        # 只有指令的块设置文件级默认值，之后的每个用例以它为基础
+        default_limits, default_compare, default_schema = {}, {}, None
+        
+        def new_case():
+            case_data = TestCase()
+            case_data.limits.update(default_limits)
+            case_data.compare.update(default_compare)
+            # 同一 schema 的用例共享同一个元组，调用计划只解析一次
+            case_data.schema = default_schema
+            return case_data
+        
+        with open(input_file, 'r', encoding='utf-8') as f:
+            current_case = new_case()
+            directives = False
+            for line in f:
                 line = line.strip()
                 if not line:  # 空行，分割测试用例
                     if current_case:
-                        self.test_cases.append(current_case)
-                        current_case = []
+                        yield current_case
+                        current_case = new_case()
+                    elif directives:
+                        default_limits, default_compare = current_case.limits, current_case.compare
+                        default_schema = current_case.schema
+                        current_case = new_case()
+                    directives = False
+                elif line.startswith(LIMITS_DIRECTIVE):
+                    limits, compare, schema = self.parse_case_directive(line)
+                    current_case.limits.update(limits)
+                    current_case.compare.update(compare)
+                    if schema:
+                        arg_types, return_type = current_case.schema or ((), None)
+                        current_case.schema = (schema.get('args', arg_types), schema.get('returns', return_type))
+                    directives = True
                 else:
-                    current_case.append(self.parse_input_line(line))
+                    current_case.append(self.parse_input_line(line, compact=True))
             
-            # 添加最后一个测试用例
+            # 产出最后一个测试用例
             if current_case:
-                self.test_cases.append(current_case)
-                
-        except Exception as e:
-            print(f"Error reading input file: {e}")
+                yield current_case
     
-    def parse_output_file(self, output_file: str):
-        """解析期望输出文件"""
-        self.expected_outputs = []
-        try:
-            with open(output_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                
-            for line in lines:
+    def parse_case_directive(self, line: str):
+        """解析用例指令：#! timeout=2 compare=unordered:2 tol=1e-6 schema=TreeNode,int，返回 (限制, 比较选项, schema)"""
+        limits, compare, schema = {}, {}, {}
+        for item in line[len(LIMITS_DIRECTIVE):].split():
+            key, _, value = item.partition('=')
+            if key in LIMIT_KEYS:
+                limits[LIMIT_KEYS[key]] = float(value)
+            elif key == 'compare':
+                # compare: 比较方式，tol: 浮点容差
+                ResultComparator.parse_spec(value)
+                compare['mode'] = value
+            elif key == 'tol':
+                compare['tolerance'] = float(value)
+            elif key == 'schema':
+                # schema: 按行顺序的参数类型，returns: 返回值类型
+                schema['args'] = parse_type_exprs(value)
+            elif key == 'returns':
+                schema['returns'] = annotation_expr(value)
+            else:
+                raise ValueError(f"Unknown directive '{key}' in: {line}")
+        return limits, compare, schema
+    
+    def iter_output_values(self, output_file: str):
+        """逐个产出期望输出文件中的值（流式读取）"""
+        with open(output_file, 'r', encoding='utf-8') as f:
+            for line in f:
                 line = line.strip()
                 if line:  # 非空行
-                    self.expected_outputs.append(self.parse_input_line(line))
-                    
+                    yield self.parse_input_line(line)
+    
+    def iter_test_pairs(self, input_file: str, output_file: str):
+        """按顺序产出 (case, expected) 对，用例数量不一致时抛出 ValueError"""
+        missing = object()
+        cases = self.iter_input_cases(input_file)
+        outputs = self.iter_output_values(output_file)
+        count = 0
+        while True:
+            case_data = next(cases, missing)
+            expected = next(outputs, missing)
+            if case_data is missing and expected is missing:
+                return
+            if case_data is missing or expected is missing:
+                # 数完剩余部分以给出准确的数量
+                n_cases = count + (case_data is not missing) + sum(1 for _ in cases)
+                n_outputs = count + (expected is not missing) + sum(1 for _ in outputs)
+                raise ValueError(f"Mismatch: {n_cases} test cases, {n_outputs} expected outputs")
+            count += 1
+            yield case_data, expected
+    
+    def parse_input_file(self, input_file: str) -> bool:
+        """解析输入文件，返回是否完整解析"""
+        self.test_cases = []
+        try:
+            for case_data in self.iter_input_cases(input_file):
+                self.test_cases.append(case_data)
+        except Exception as e:
+            print(f"Error reading input file: {e}")
+            return False
+        return True
+    
+    def parse_output_file(self, output_file: str) -> bool:
+        """解析期望输出文件，返回是否完整解析"""
+        self.expected_outputs = []
+        try:
+            for value in self.iter_output_values(output_file):
+                self.expected_outputs.append(value)
         except Exception as e:
             print(f"Error reading output file: {e}")
+            return False
+        return True
     
-    def parse_input_line(self, line: str):
+    def parse_input_line(self, line: str, compact: bool = False):
         """解析单行输入，支持各种数据类型"""
         line = line.strip()
         
-        # 处理null
-        line = line.replace('null', 'None')
-        line = line.replace('true', 'True')
-        line = line.replace('false', 'False')
+        # 紧凑模式：一维整数数组直接解析进 array('q')，不先构造完整的 Python 列表
+        if compact and self.int_array_mode and line.startswith('[') and not line.startswith('[['):
+            packed = self.parse_int_array_line(line)
+            if packed is not None:
+                return packed
+        
+        # 快速路径：JSON 原生支持 null/true/false
+        try:
+            value = json.loads(line)
+        except ValueError:
+            pass
+        else:
+            # 紧凑模式：纯整数数组转为 array('q') / NumPy 缓冲区
+            if compact and self.int_array_mode and type(value) is list and value:
+                return self.pack_int_array(value)
+            return value
+        
+        # 回退：Python 字面量（单引号字符串、元组等），只替换字符串外的关键字
+        python_line = LITERAL_TOKEN_RE.sub(
+            lambda m: LITERAL_KEYWORDS[m.group(1)] if m.group(1) else m.group(0), line)
         
+        import ast
         try:
-            # 尝试直接解析为Python对象
-            return ast.literal_eval(line)
-        except:
+            return ast.literal_eval(python_line)
+        except Exception:
             # 如果失败，尝试作为字符串处理
             if line.startswith('"') and line.endswith('"'):
                 return line[1:-1]
@@ -273,168 +2115,462 @@ class LeetCodeTester:
             else:
                 return line
     
+    def pack_int_array(self, values: List):
+        """将纯整数列表打包为 array('q') 或 NumPy 数组，含非整数或超出 int64 范围时原样返回"""
+        if not all(type(v) is int for v in values):
+            return values
+        try:
+            packed = array('q', values)
+        except OverflowError:
+            return values
+        return self.wrap_int_array(packed)
+    
+    def parse_int_array_line(self, line: str, chunk_size: int = 1 << 16):
+        """把 [1,2,3] 形式的整数数组行逐块拆分解析进 array('q')，峰值内存只多出一块的临时对象；
+        不是纯整数数组或超出 int64 范围时返回 None"""
+        packed = array('q')
+        fromlist = packed.fromlist
+        pos, end = 1, len(line) - 1
+        if line[end] != ']' or end <= pos:
+            return None
+        try:
+            while pos < end:
+                stop = end if end - pos <= chunk_size else line.rfind(',', pos, pos + chunk_size)
+                if stop <= pos:
+                    return None
+                fromlist(list(map(int, line[pos:stop].split(','))))
+                pos = stop + 1
+        except (ValueError, OverflowError):
+            return None  # null、浮点数、嵌套数组等交给通用解析
+        return self.wrap_int_array(packed)
+    
+    def wrap_int_array(self, packed: array):
+        """按 --compact-ints 返回 array('q') 或共享其缓冲区的 NumPy 数组"""
+        if self.int_array_mode == 'numpy':
+            import numpy as np
+            # 直接复用 array 的缓冲区，不再复制
+            return np.frombuffer(packed, dtype=np.int64)
+        return packed
+    
     def build_tree_from_list(self, nodes: List):
         """从列表构建二叉树"""
-        if not nodes or nodes[0] is None:
-            return None
-        
-        root = TreeNode(nodes[0])
-        queue = deque([root])
-        i = 1
-        
-        while queue and i < len(nodes):
-            node = queue.popleft()
-            
-            # 添加左子节点
-            if i < len(nodes) and nodes[i] is not None:
-                node.left = TreeNode(nodes[i])
-                queue.append(node.left)
-            i += 1
-            
-            # 添加右子节点
-            if i < len(nodes) and nodes[i] is not None:
-                node.right = TreeNode(nodes[i])
-                queue.append(node.right)
-            i += 1
-        
-        return root
+        return build_binary_tree(TreeNode, nodes)
     
     def build_list_from_array(self, arr: List):
         """从数组构建链表"""
-        if not arr:
-            return None
-        
-        head = ListNode(arr[0])
-        current = head
-        for val in arr[1:]:
-            current.next = ListNode(val)
-            current = current.next
-        
-        return head
+        return build_linked_list(ListNode, arr)
     
     def tree_to_list(self, root: TreeNode):
         """将二叉树转换为列表（层序遍历）"""
-        if not root:
-            return []
-        
-        result = []
-        queue = deque([root])
-        
-        while queue:
-            node = queue.popleft()
-            if node:
-                result.append(node.val)
-                queue.append(node.left)
-                queue.append(node.right)
-            else:
-                result.append(None)
-        
-        # 移除末尾的None
-        while result and result[-1] is None:
-            result.pop()
-        
-        return result
+        return serialize_binary_tree(root)
     
     def list_to_array(self, head: ListNode):
-        """将链表转换为数组"""
-        result = []
-        current = head
-        while current:
-            result.append(current.val)
-            current = current.next
-        return result
+        """将链表转换为数组，链表有环时抛出 CyclicStructureError"""
+        return serialize_linked_list(head)
     
     def detect_method_signature(self):
-        """检测解决方案的方法签名"""
+        """检测解决方案的方法签名：--method 指定的方法，否则类中定义的第一个公有方法"""
         if not self.solution_class:
             return None, []
-            
-        methods = [method for method in dir(self.solution_class) 
-                  if not method.startswith('_')]
         
-        if not methods:
-            return None, []
+        if self.target_method:
+            if not callable(getattr(self.solution_class, self.target_method, None)):
+                return None, []
+            method_name = self.target_method
+        else:
+            # 按类体中的定义顺序，而不是 dir() 的字母顺序；类体中没有时再看继承的方法
+            methods = [name for name, value in vars(self.solution_class).items()
+                       if not name.startswith('_') and
+                       (callable(value) or isinstance(value, (staticmethod, classmethod)))]
+            if not methods:
+                methods = [name for name in dir(self.solution_class)
+                           if not name.startswith('_') and callable(getattr(self.solution_class, name))]
+            if not methods:
+                return None, []
+            method_name = methods[0]
         
-        # 获取第一个非私有方法
-        method_name = methods[0]
+        # 获取方法参数（普通方法排除self）
         method = getattr(self.solution_class, method_name)
-        
-        # 获取方法参数（排除self）
-        import inspect
-        sig = inspect.signature(method)
-        params = list(sig.parameters.keys())[1:]  # 排除self
+        params = parameter_names(method)
+        if isinstance(static_class_attr(self.solution_class, method_name), types.FunctionType):
+            params = params[1:]
         
         return method_name, params
     
+    def get_call_plan(self, case_data: Optional[List] = None):
+        """返回当前解决方案的调用计划，首次使用时解析并缓存；用例的 schema 变化时重新解析"""
+        schema = getattr(case_data, 'schema', None)
+        plan = self.call_plan
+        if (plan is not None and plan.solution_class is self.solution_class
+                and (plan.schema is schema or plan.schema == schema)):
+            return plan
+        
+        method_name, params = self.detect_method_signature()
+        if not method_name:
+            return None
+        
+        arg_types, return_type = self.signature_types(method_name, params, schema)
+        converters = [self.type_converter(arg_type) if arg_type is not None else self.resolve_converter(name)
+                      for name, arg_type in zip(params, arg_types)]
+        serialize_result = self.type_converter(return_type, serialize=True) if return_type is not None else None
+        serialize_input = None
+        if return_type == NONE_TYPE and arg_types and arg_types[0] is not None:
+            serialize_input = self.type_converter(arg_types[0], serialize=True)
+        self.call_plan = CallPlan(self.solution_class, method_name, params, converters,
+                                  self.reuse_instance, schema, serialize_result, serialize_input)
+        return self.call_plan
+    
+    def signature_types(self, method_name: str, params: List[str], schema: Optional[tuple]):
+        """参数和返回值的类型表达式：input.txt 的 schema 优先，其次是类型注解，都没有时为 None"""
+        annotations = getattr(getattr(self.solution_class, method_name), '__annotations__', None) or {}
+        
+        def expr(name):
+            try:
+                return annotation_expr(annotations[name]) if name in annotations else None
+            except ValueError:
+                return None  # 无法识别的注解，按没有注解处理
+        
+        arg_types = [expr(name) for name in params]
+        return_type = expr('return')
+        if schema is not None:
+            schema_args, schema_return = schema
+            arg_types[:len(schema_args)] = schema_args[:len(params)]
+            if schema_return is not None:
+                return_type = schema_return
+        return arg_types, return_type
+    
+    def type_converter(self, expr: tuple, serialize: bool = False):
+        """把类型表达式解析为转换函数（构建输入，或 serialize=True 时序列化结果），无需转换时返回 None"""
+        name, args = expr
+        if name == 'Optional':
+            return self.type_converter(args[0], serialize)
+        if name == 'List':
+            convert = self.type_converter(args[0], serialize) if args else None
+            if convert is None:
+                return None
+            return lambda values: [convert(value) for value in values]
+        
+        node_type = self.node_type(name)
+        if node_type is None:
+            return None
+        if serialize:
+            return node_type.serialize
+        build, node_class = node_type.build, self.node_class(node_type)
+        return lambda data: build(node_class, data)
+    
+    def node_type(self, name: str) -> Optional[NodeType]:
+        """类型名对应的节点类型；Node 有多种含义，按解决方案中 Node 类的构造参数区分"""
+        node_type = NODE_TYPES.get(name)
+        if node_type is not None:
+            return node_type
+        candidates = [node_type for node_type in NODE_TYPES.values() if node_type.class_name == name]
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+        
+        node_class = self.solution_module.__dict__.get(name)
+        if isinstance(node_class, type):
+            params = parameter_names(node_class.__init__)
+            for node_type in candidates:
+                if node_type.marker in params:
+                    return node_type
+        kinds = [key for key, node_type in NODE_TYPES.items() if node_type in candidates]
+        raise ValueError(f"Cannot tell which kind of {name} the solution uses ({', '.join(kinds)}); "
+                         f"declare it in input.txt, e.g. '#! schema={kinds[0]}'")
+    
+    def node_class(self, node_type: NodeType) -> type:
+        """构建输入使用的节点类：解决方案中的同名类，没有时注入默认实现（解决方案也要用它构造新节点）"""
+        namespace = self.solution_module.__dict__
+        cls = namespace.get(node_type.class_name)
+        if not isinstance(cls, type):
+            cls = namespace[node_type.class_name] = node_type.default_class
+        return cls
+    
+    def resolve_converter(self, param_name: str):
+        """没有类型信息时按参数名推断参数转换器，None 表示原样传入"""
+        name = param_name.lower()
+        # 节点类取自解决方案模块：解决方案可能自己定义了 TreeNode / ListNode
+        if 'tree' in name or 'root' in name:
+            return self.type_converter(('TreeNode', ()))
+        if 'list' in name or name == 'head':
+            build_list = self.type_converter(('ListNode', ()))
+            # 可能是链表：只有非空整数数组才转换
+            def convert_list(param_data):
+                if isinstance(param_data, (list, array)) and param_data and isinstance(param_data[0], int):
+                    return build_list(param_data)
+                return param_data
+            return convert_list
+        return None
+    
     def run_test_case(self, case_data: List, expected: Any):
         """运行单个测试用例"""
         if not self.solution_class:
-            return False, "No solution class found", 0.0
+            return False, "No solution class found", 0.0, {}
+        
+        # 有资源限制时在独立子进程中运行
+        limits = dict(self.limits)
+        limits.update(getattr(case_data, 'limits', {}))
+        if any(limits.values()):
+            return self.run_isolated_test_case(case_data, expected, limits)
         
+        return self.execute_test_case(case_data, expected)
+    
+    def execute_test_case(self, case_data: List, expected: Any):
+        """在当前进程中执行单个测试用例并计时，返回 (success, result, execution_time, metrics)"""
+        metrics = {}
+        # 基准测试需要运行前的输入：解决方案可能原地修改甚至清空参数
+        snapshot = None
+        if self.bench:
+            import pickle
+            snapshot = pickle.dumps(case_data, pickle.HIGHEST_PROTOCOL)
         try:
             # 记录开始时间
             start_time = time.perf_counter()
             
             # 检测是否是设计类题目（如MedianFinder）
-            if hasattr(self.solution_class, '__init__') and len(case_data) > 1:
-                success, result = self.run_design_class_test(case_data, expected)
+            if self.is_design_case(case_data):
+                success, result = self.run_design_class_test(case_data, expected, metrics)
             else:
-                success, result = self.run_function_test(case_data, expected)
+                success, result = self.run_function_test(case_data, expected, metrics)
             
             # 记录结束时间
             end_time = time.perf_counter()
             execution_time = end_time - start_time
             
-            return success, result, execution_time
-                
+            # 基准测试：只对通过的用例重复计时
+            if success and self.bench:
+                metrics['bench'] = self.benchmark_case(snapshot)
+            
+            return success, result, execution_time, metrics
+        
+        except MemoryError:
+            execution_time = time.perf_counter() - start_time
+            return False, LimitExceeded(LimitExceeded.MLE, "MemoryError"), execution_time, metrics
+        except InvalidOutputError as e:
+            execution_time = time.perf_counter() - start_time
+            return False, f"Invalid output: {e}", execution_time, metrics
         except Exception as e:
             end_time = time.perf_counter()
             execution_time = end_time - start_time if 'start_time' in locals() else 0.0
-            return False, f"Runtime error: {str(e)}", execution_time
+            return False, f"Runtime error: {str(e)}", execution_time, metrics
     
-    def run_function_test(self, case_data: List, expected: Any):
-        """运行函数类型的测试"""
-        solution = self.solution_class()
-        method_name, params = self.detect_method_signature()
+    def is_design_case(self, case_data: List) -> bool:
+        """判断用例是否按设计类题目运行：第一行是以类名开头的操作列表"""
+        if len(case_data) != 2:
+            return False
+        methods = case_data[0]
+        return (isinstance(methods, list) and len(methods) > 0
+                and methods[0] == self.solution_class.__name__)
+    
+    def run_isolated_test_case(self, case_data: List, expected: Any, limits: Dict):
+        """在 fork 出的子进程中运行用例，用 setrlimit 限制 CPU 时间和内存"""
+        timeout = limits.get('timeout')
+        cpu_time = limits.get('cpu_time')
+        memory_mb = limits.get('memory_mb')
         
-        if not method_name:
-            return False, "No method found"
+        import multiprocessing
+        ctx = multiprocessing.get_context('fork')
+        reader, writer = ctx.Pipe(duplex=False)
+        child = ctx.Process(target=_run_limited_child,
+                            args=(self, case_data, expected, cpu_time, memory_mb, writer))
         
-        method = getattr(solution, method_name)
+        start_time = time.perf_counter()
+        child.start()
+        writer.close()
         
-        # 准备参数
-        args = []
-        for i, param_data in enumerate(case_data):
-            # 根据参数名推断数据类型
-            if i < len(params):
-                param_name = params[i]
-                if 'tree' in param_name.lower() or 'root' in param_name.lower():
-                    args.append(self.build_tree_from_list(param_data))
-                elif 'list' in param_name.lower() and isinstance(param_data, list) and param_data and isinstance(param_data[0], int):
-                    # 可能是链表
-                    args.append(self.build_list_from_array(param_data))
-                else:
-                    args.append(param_data)
+        try:
+            # 墙钟超时：子进程在限定时间内没有返回结果
+            if reader.poll(timeout or None):
+                try:
+                    return reader.recv()
+                except EOFError:
+                    pass  # 子进程未返回结果就退出了，下面根据退出码判定
             else:
-                args.append(param_data)
+                child.kill()
+                child.join()
+                return False, LimitExceeded(LimitExceeded.TLE, f"wall time > {timeout:g}s"), \
+                    time.perf_counter() - start_time, {}
+        finally:
+            reader.close()
+            child.join()
+        
+        execution_time = time.perf_counter() - start_time
+        if child.exitcode in (-signal.SIGXCPU, -signal.SIGKILL) and cpu_time:
+            return False, LimitExceeded(LimitExceeded.TLE, f"CPU time > {cpu_time:g}s"), execution_time, {}
+        # 内存耗尽时子进程可能来不及返回结果：未能上报的 MemoryError、分配失败导致的 abort / 段错误或被 OOM killer 杀死
+        if memory_mb and child.exitcode in (MEMORY_ERROR_EXIT_CODE, -signal.SIGABRT, -signal.SIGSEGV, -signal.SIGKILL):
+            return False, LimitExceeded(LimitExceeded.MLE, f"exit code {child.exitcode}"), execution_time, {}
+        return False, f"Runtime error: child exited with code {child.exitcode}", execution_time, {}
+    
+    def build_function_call(self, case_data: List):
+        """按调用计划取得绑定方法并构造参数，返回 (method, args)；找不到方法时 method 为 None"""
+        plan = self.get_call_plan(case_data)
+        if plan is None:
+            return None, []
+        return plan.bind(), plan.build_args(case_data)
+    
+    def start_memory_trace(self):
+        """开始跟踪内存分配（输入构造完成之后调用）"""
+        import tracemalloc
+        tracemalloc.start()
+    
+    def stop_memory_trace(self, metrics: Optional[Dict]):
+        """停止跟踪，记录峰值和解决方案文件中的主要分配位置"""
+        import tracemalloc
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        if metrics is None:
+            return
+        
+        if self.solution_file:
+            snapshot = snapshot.filter_traces([tracemalloc.Filter(True, self.solution_file)])
+        else:
+            snapshot = snapshot.filter_traces([tracemalloc.Filter(False, __file__),
+                                               tracemalloc.Filter(False, tracemalloc.__file__)])
+        top = []
+        for stat in snapshot.statistics('lineno')[:self.memory_top]:
+            frame = stat.traceback[0]
+            top.append((f"{os.path.basename(frame.filename)}:{frame.lineno}", stat.size, stat.count))
+        metrics['memory'] = {'peak': peak, 'top': top}
+    
+    def start_profile(self):
+        """开始分析解决方案调用：cProfile 或 SIGPROF 采样"""
+        if self.profile_mode == 'sample':
+            profiler = SamplingProfiler(self.solution_file or '<solution>')
+            profiler.start()
+        else:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return profiler
+    
+    def stop_profile(self, profiler, metrics: Optional[Dict]):
+        """停止分析，把可序列化的结果记入 metrics['profile']"""
+        if self.profile_mode == 'sample':
+            profiler.stop()
+            profile = {'kind': 'sample', 'stacks': dict(profiler.stacks), 'lines': dict(profiler.lines)}
+        else:
+            profiler.disable()
+            profiler.create_stats()
+            # 只保留解决方案文件中的函数及其直接调用的函数（内置函数、标准库），
+            # 测试器自身的比较、方法解析等开销不计入
+            filename = self.solution_file or '<solution>'
+            profile = {'kind': 'cprofile',
+                       'stats': {func: (cc, nc, tt, ct)
+                                 for func, (cc, nc, tt, ct, callers) in profiler.stats.items()
+                                 if func[0] == filename or any(caller[0] == filename for caller in callers)}}
+        if metrics is not None:
+            metrics['profile'] = profile
+    
+    def merge_profile(self, total: Optional[Dict], profile: Dict) -> Dict:
+        """把一个用例的分析结果合并到全套汇总中"""
+        if total is None:
+            total = {'kind': profile['kind'], 'stacks': defaultdict(int), 'lines': defaultdict(int),
+                     'stats': defaultdict(lambda: [0, 0, 0.0, 0.0])}
+        if profile['kind'] == 'sample':
+            for key in ('stacks', 'lines'):
+                for item, count in profile[key].items():
+                    total[key][item] += count
+        else:
+            for func, values in profile['stats'].items():
+                entry = total['stats'][func]
+                for i, value in enumerate(values):
+                    entry[i] += value
+        return total
+    
+    def profile_label(self, func) -> str:
+        """cProfile 条目的显示名：解决方案中的函数带行号，内置函数只显示名字"""
+        filename, lineno, name = func
+        if filename == '~':
+            return name
+        if filename == self.solution_file:
+            return f"{name} (line {lineno})"
+        return f"{name} ({os.path.basename(filename)}:{lineno})"
+    
+    def print_profile(self, profile: Dict, top: int, title: str = 'Profile:'):
+        """打印热点：cProfile 按函数自身耗时排序，采样按代码行的采样次数排序"""
+        fmt = self.format_duration
+        if profile['kind'] == 'sample':
+            lines = profile['lines']
+            total = sum(lines.values())
+            if not total:
+                print(f"{self.colorize_text(title, 'cyan')} no samples (call shorter than the sampling interval)")
+                return
+            print(f"{self.colorize_text(title, 'cyan')} {total} samples")
+            name = os.path.basename(self.solution_file or '<solution>')
+            for (lineno, func), count in heapq.nlargest(top, lines.items(), key=lambda item: item[1]):
+                print(f"  {count / total:6.1%}  {count:>6}  {name}:{lineno} ({func})")
+            return
+        
+        stats = profile['stats']
+        print(self.colorize_text(title, 'cyan'))
+        print(f"  {'tottime':>10} {'cumtime':>10} {'calls':>9}  function")
+        for func, (_, calls, tottime, cumtime) in heapq.nlargest(top, stats.items(), key=lambda item: item[1][2]):
+            print(f"  {fmt(tottime):>10} {fmt(cumtime):>10} {calls:>9}  {self.profile_label(func)}")
+    
+    def dump_profile(self, profile: Dict, path: str):
+        """导出全套分析结果：cProfile 写 .pstats，采样写火焰图使用的折叠调用栈"""
+        if profile['kind'] == 'sample':
+            with open(path, 'w', encoding='utf-8') as f:
+                for stack, count in sorted(profile['stacks'].items()):
+                    f.write(f"{stack} {count}\n")
+        else:
+            # pstats 的文件格式：{func: (cc, nc, tt, ct, callers)}
+            with open(path, 'wb') as f:
+                marshal.dump({func: tuple(values) + ({},) for func, values in profile['stats'].items()}, f)
+    
+    def run_function_test(self, case_data: List, expected: Any, metrics: Optional[Dict] = None):
+        """运行函数类型的测试"""
+        comparator = self.get_comparator(case_data)
+        # 校验函数需要解决方案修改之前的输入
+        original_args = copy.deepcopy(list(case_data)) if comparator.validator is not None else None
+        method, args = self.build_function_call(case_data)
         
-        # 执行方法
-        result = method(*args)
+        if method is None:
+            return False, "No method found"
         
+        # 执行方法（内存跟踪和性能分析只包住解决方案调用本身）
+        if self.memory_top:
+            self.start_memory_trace()
+        profiler = self.start_profile() if self.profile_mode else None
+        try:
+            result = method(*args)
+        finally:
+            if profiler is not None:
+                self.stop_profile(profiler, metrics)
+            if self.memory_top:
+                self.stop_memory_trace(metrics)
+        
+        # 按返回类型序列化节点结构；返回 None 的原地修改题目（如 flatten）序列化第一个参数
+        plan = self.call_plan
+        if result is None and args and plan.serialize_input is not None:
+            result = plan.serialize_input(args[0])
+        elif plan.serialize_result is not None:
+            result = plan.serialize_result(result)
         # 特殊处理：如果方法返回None但修改了输入参数（如moveZeroes）
-        if result is None and args:
+        elif result is None and args:
             # 检查第一个参数是否被修改（通常是数组）
-            if isinstance(args[0], list):
+            if isinstance(args[0], (list, array)) or type(args[0]).__module__ == 'numpy':
                 result = args[0]
         
         # 处理结果
         processed_result = self.process_result(result)
         processed_expected = self.process_result(expected)
         
-        return processed_result == processed_expected, processed_result
+        return comparator.match(processed_result, processed_expected, original_args), processed_result
+    
+    def get_comparator(self, case_data: List) -> ResultComparator:
+        """用例使用的比较器：用例指令覆盖题目级设置，同一配置只创建一次"""
+        options = getattr(case_data, 'compare', None) or {}
+        key = (options.get('mode', self.compare_mode), options.get('tolerance', self.tolerance))
+        comparator = self.comparators.get(key)
+        if comparator is None:
+            validator = load_validator(self.validator_file) if self.validator_file else None
+            comparator = self.comparators[key] = ResultComparator(key[0], key[1], validator)
+        return comparator
     
-    def run_design_class_test(self, case_data: List, expected: Any):
-        """运行设计类的测试"""
+    def run_design_class_test(self, case_data: List, expected: Any, metrics: Optional[Dict] = None):
+        """运行设计类的测试：结果与期望按位置逐个比较，在第一个不一致的操作处停止"""
         if len(case_data) < 2:
             return False, "Invalid design class test case"
         
@@ -444,40 +2580,548 @@ class LeetCodeTester:
         if not isinstance(methods, list) or not isinstance(params_list, list):
             return False, "Invalid design class test format"
         
+        cls = self.solution_class
+        class_name = cls.__name__
+        resolved = self.design_methods(cls)
+        # 期望输出与操作一一对应时逐个比较；否则兼容旧格式（去掉 None 后整体比较）
+        positional = isinstance(expected, list) and len(expected) == len(methods)
+        comparator = self.get_comparator(case_data)
+        # 逐操作计时（--op-stats），只计方法调用本身
+        durations = array('q') if self.op_stats_top and metrics is not None else None
+        clock = time.perf_counter_ns
+        scalar_types = (int, float, str, bool, type(None))
+        
         results = []
         obj = None
+        mismatch = None
         
-        for i, (method_name, params) in enumerate(zip(methods, params_list)):
-            if method_name == self.solution_class.__name__:
-                # 构造函数
-                obj = self.solution_class(*params)
-                results.append(None)
-            else:
-                if obj is None:
-                    return False, "Object not initialized"
+        if self.memory_top:
+            self.start_memory_trace()
+        profiler = self.start_profile() if self.profile_mode else None
+        try:
+            for i, (method_name, params) in enumerate(zip(methods, params_list)):
+                try:
+                    if method_name == class_name:
+                        # 构造函数
+                        if durations is not None:
+                            start = clock()
+                            obj = cls(*params)
+                            durations.append(clock() - start)
+                        else:
+                            obj = cls(*params)
+                        result = None
+                    else:
+                        if obj is None:
+                            return False, "Object not initialized"
+                        method = resolved.get(method_name) or self.resolve_design_method(cls, method_name)
+                        if durations is not None:
+                            start = clock()
+                            result = method(obj, *params)
+                            durations.append(clock() - start)
+                        else:
+                            result = method(obj, *params)
+                    if type(result) not in scalar_types:
+                        result = self.process_result(result)
+                except (MemoryError, InvalidOutputError):
+                    raise
+                except Exception as e:
+                    raise RuntimeError(f"operation {i} {method_name}: {type(e).__name__}: {e}") from e
                 
-                method = getattr(obj, method_name)
-                result = method(*params)
                 results.append(result)
+                if positional and result != expected[i] and not comparator.equivalent(result, expected[i]):
+                    mismatch = i
+                    break
+        finally:
+            if profiler is not None:
+                self.stop_profile(profiler, metrics)
+            if self.memory_top:
+                self.stop_memory_trace(metrics)
         
-        # 过滤掉None结果（构造函数）
-        filtered_results = [r for r in results if r is not None]
+        if metrics is not None:
+            design = {'ops': len(results), 'mismatch': None}
+            if mismatch is not None:
+                design['mismatch'] = (mismatch, methods[mismatch],
+                                      ValueSummarizer(60).summarize(params_list[mismatch]))
+            if durations is not None:
+                design['stats'] = self.summarize_op_timings(methods, params_list, durations)
+            metrics['design'] = design
+        
+        if positional:
+            return mismatch is None, results
         
+        # 旧格式：过滤掉None结果（构造函数和无返回值的方法）
+        filtered_results = [r for r in results if r is not None]
         if isinstance(expected, list):
             expected_filtered = [e for e in expected if e is not None]
             return filtered_results == expected_filtered, filtered_results
         else:
             return filtered_results == [expected], filtered_results
     
+    def design_methods(self, cls: type) -> Dict:
+        """设计类的方法缓存：操作名 -> 未绑定的函数，同一个类的所有用例共享"""
+        if self.design_method_cache.get('__class__') is not cls:
+            self.design_method_cache = {'__class__': cls}
+        return self.design_method_cache
+    
+    def resolve_design_method(self, cls: type, method_name: str):
+        """解析一次操作名对应的函数并缓存，之后按 func(obj, *params) 调用"""
+        if method_name.startswith('_') or not callable(getattr(cls, method_name, None)):
+            raise AttributeError(f"{cls.__name__} has no method {method_name!r}")
+        raw = static_class_attr(cls, method_name)
+        func = getattr(cls, method_name)
+        if isinstance(raw, (staticmethod, classmethod)):
+            # 静态方法和类方法不接收实例
+            func = (lambda f: lambda obj, *args: f(*args))(func)
+        self.design_methods(cls)[method_name] = func
+        return func
+    
+    def summarize_op_timings(self, methods: List, params_list: List, durations: array) -> Dict:
+        """汇总逐操作耗时：最慢的操作，以及每个方法的调用次数、分位数和 log2 直方图"""
+        by_method = defaultdict(list)
+        for method_name, duration in zip(methods, durations):
+            by_method[method_name].append(duration)
+        
+        per_method = {}
+        for method_name, values in by_method.items():
+            values.sort()
+            histogram = defaultdict(int)
+            for value in values:
+                histogram[max(value, 1).bit_length()] += 1
+            per_method[method_name] = {
+                'count': len(values), 'total': sum(values) / 1e9,
+                'p50': values[len(values) // 2] / 1e9,
+                'p99': values[min(len(values) - 1, int(len(values) * 0.99))] / 1e9,
+                'max': values[-1] / 1e9, 'histogram': dict(histogram)}
+        
+        summarizer = ValueSummarizer(40)
+        slowest = [(durations[i] / 1e9, i, methods[i], summarizer.summarize(params_list[i]))
+                   for i in heapq.nlargest(self.op_stats_top, range(len(durations)), key=durations.__getitem__)]
+        return {'per_method': per_method, 'slowest': slowest}
+    
+    def build_design_call(self, case_data: List):
+        """构造重放设计类操作序列的无参调用，返回 (replay, ())"""
+        methods, params_list = case_data[0], case_data[1]
+        cls = self.solution_class
+        resolved = self.design_methods(cls)
+        
+        def replay():
+            obj = None
+            for method_name, params in zip(methods, params_list):
+                if method_name == cls.__name__:
+                    obj = cls(*params)
+                else:
+                    (resolved.get(method_name) or self.resolve_design_method(cls, method_name))(obj, *params)
+        
+        return replay, ()
+    
+    def benchmark_case(self, snapshot: bytes, batch_bytes: int = 4 << 20):
+        """从运行前的输入快照（pickle）重复计时一个用例，输入构造和结果转换不计入时间；
+        每批还原的输入不超过 batch_bytes（按快照大小计），快速调用 + 大输入时内存依然有界"""
+        import pickle
+        case_data = pickle.loads(snapshot)
+        warmup = self.bench.get('warmup', 3)
+        repeat = max(1, self.bench.get('repeat', 20))
+        min_time = self.bench.get('min_time', 1e-3)
+        disable_gc = self.bench.get('disable_gc', False)
+        make_call = self.build_design_call if self.is_design_case(case_data) else self.build_function_call
+        
+        batch = max(1, batch_bytes // len(snapshot))
+        
+        def sample(loops: int) -> float:
+            """计时一次采样（loops 次调用，分批进行），返回总耗时"""
+            elapsed = 0.0
+            for done in range(0, loops, batch):
+                # 每次调用都使用从快照还原的独立输入，避免原地修改影响后续调用
+                calls = [make_call(pickle.loads(snapshot)) for _ in range(min(batch, loops - done))]
+                gc_was_enabled = gc.isenabled()
+                if disable_gc:
+                    gc.disable()
+                try:
+                    start = time.perf_counter()
+                    for method, args in calls:
+                        method(*args)
+                    elapsed += time.perf_counter() - start
+                finally:
+                    if gc_was_enabled:
+                        gc.enable()
+                # 先释放本批输入再还原下一批（循环变量也引用着最后一个输入，否则它会在下一批的计时中被释放）
+                calls = method = args = None
+            return elapsed
+        
+        for _ in range(warmup):
+            sample(1)
+        
+        # 自动校准每次采样的调用次数（1, 2, 5, 10, 20, 50, ...），使单次采样耗时不低于 min_time
+        loops = 1
+        while True:
+            elapsed = sample(loops)
+            if elapsed >= min_time or loops >= 10 ** 6:
+                break
+            loops = loops * 5 // 2 if str(loops)[0] == '2' else loops * 2
+        
+        import statistics
+        samples = sorted(sample(loops) / loops for _ in range(repeat))
+        return {
+            'min': samples[0],
+            'median': statistics.median(samples),
+            'p95': samples[min(len(samples) - 1, -(-95 * len(samples) // 100) - 1)],
+            'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            'repeat': repeat,
+            'loops': loops,
+            'gc_disabled': disable_gc,
+        }
+    
+    def scale_case(self, case_data: List, n: int):
+        """把已有用例中的数组 / 字符串参数平铺扩展到长度 n，其他参数保持不变"""
+        scaled = []
+        for value in case_data:
+            if isinstance(value, (list, str, array)) and len(value) > 0:
+                repeats = -(-n // len(value))
+                scaled.append((value * repeats)[:n])
+            else:
+                scaled.append(value)
+        return scaled
+    
+    def measure_scaled_call(self, case_data: List, repeat: int = 3, measure_memory: bool = False):
+        """计时一次放大后的调用（取 repeat 次最小值），可选测量内存峰值"""
+        best = float('inf')
+        for _ in range(repeat):
+            method, args = self.build_function_call(copy.deepcopy(case_data))
+            start = time.perf_counter()
+            method(*args)
+            best = min(best, time.perf_counter() - start)
+        
+        peak = None
+        if measure_memory:
+            import tracemalloc
+            method, args = self.build_function_call(copy.deepcopy(case_data))
+            tracemalloc.start()
+            try:
+                method(*args)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        return best, peak
+    
+    def fit_complexity(self, sizes: List[int], values: List[float]):
+        """在 log-log 空间中拟合候选复杂度类，返回 (最佳类, R², 测得的幂指数, 全部拟合结果)"""
+        log_n = [math.log2(n) for n in sizes]
+        log_v = [math.log2(max(v, 1e-12)) for v in values]
+        mean_v = sum(log_v) / len(log_v)
+        ss_tot = sum((v - mean_v) ** 2 for v in log_v) or 1e-12
+        
+        fits = []
+        for name, log_f in COMPLEXITY_CLASSES:
+            fx = [log_f(n) for n in sizes]
+            # 只拟合常数系数：log v = log c + log f(n)
+            log_c = sum(v - f for v, f in zip(log_v, fx)) / len(fx)
+            ss_res = sum((v - log_c - f) ** 2 for v, f in zip(log_v, fx))
+            fits.append((name, 1 - ss_res / ss_tot))
+        
+        # 测得的幂指数：log v 对 log n 的最小二乘斜率
+        mean_n = sum(log_n) / len(log_n)
+        var_n = sum((x - mean_n) ** 2 for x in log_n) or 1e-12
+        exponent = sum((x - mean_n) * (v - mean_v) for x, v in zip(log_n, log_v)) / var_n
+        
+        best_name, best_r2 = max(fits, key=lambda fit: fit[1])
+        return best_name, best_r2, exponent, fits
+    
+    def estimate_complexity(self, make_case, min_size: int = 256, max_size: int = 1 << 16,
+                            measure_memory: bool = False, time_budget: float = 1.0):
+        """按几何增长的规模运行解决方案，返回 [(n, 耗时, 内存峰值), ...]"""
+        measurements = []
+        n = max(4, min_size)
+        while n <= max_size:
+            elapsed, peak = self.measure_scaled_call(make_case(n), measure_memory=measure_memory)
+            measurements.append((n, elapsed, peak))
+            # 单次调用已经很慢时不再继续放大
+            if elapsed > time_budget:
+                break
+            n *= 2
+        return measurements
+    
+    def run_complexity_analysis(self, make_case, min_size: int, max_size: int,
+                                measure_memory: bool = False, max_exponent: Optional[float] = None):
+        """运行复杂度估计并打印报告，幂指数超过阈值时返回 False"""
+        print(self.colorize_text("📈 Estimating complexity...", 'bright_yellow'))
+        print("-" * 60)
+        
+        try:
+            measurements = self.estimate_complexity(make_case, min_size, max_size, measure_memory)
+        except Exception as e:
+            print(self.colorize_text(f"❌ Runtime error: {e}", 'red'))
+            return False
+        
+        for n, elapsed, peak in measurements:
+            line = f"  n={n:<10} {self.colorize_text(self.format_duration(elapsed), 'cyan')}"
+            if peak is not None:
+                line += f"  peak {peak / 1024:.1f}KB"
+            print(line)
+        
+        if len(measurements) < 3:
+            print(self.colorize_text("❌ Need at least 3 sizes to estimate complexity", 'red'))
+            return False
+        
+        sizes = [n for n, _, _ in measurements]
+        success = True
+        reports = [('Time', [elapsed for _, elapsed, _ in measurements])]
+        if measure_memory:
+            reports.append(('Memory', [peak or 1 for _, _, peak in measurements]))
+        
+        print("\n" + "=" * 60)
+        for label, values in reports:
+            best_name, best_r2, exponent, _ = self.fit_complexity(sizes, values)
+            print(f"{self.colorize_text(f'{label}:', 'cyan')} "
+                  f"{self.colorize_text(best_name, 'bright_green')} "
+                  f"(R² = {best_r2:.3f}, measured exponent {exponent:.2f})")
+            if label == 'Time' and max_exponent is not None and exponent > max_exponent:
+                print(self.colorize_text(
+                    f"❌ Measured exponent {exponent:.2f} exceeds the limit {max_exponent:g}", 'bright_red'))
+                success = False
+        print("=" * 60)
+        return success
+    
+    def diff_check(self, reference: 'LeetCodeTester', case_data: List):
+        """用参考解计算期望值并与当前解比较，返回 (是否一致, 期望, 实际)；参考解本身出错时返回 None"""
+        try:
+            _, expected = reference.run_function_test(copy.deepcopy(case_data), None)
+        except Exception:
+            return None  # 输入超出参考解的约束，不算分歧
+        try:
+            success, actual = self.run_function_test(copy.deepcopy(case_data), expected)
+        except Exception as e:
+            return False, expected, f"Runtime error: {e}"
+        return success, expected, actual
+    
+    def run_diff_batch(self, reference: 'LeetCodeTester', generator: CaseGenerator,
+                       seed: int, start: int, count: int):
+        """生成并比较一批用例，返回 (有效用例数, 第一个分歧 (index, case, expected, actual) 或 None)"""
+        import random
+        checked = 0
+        for index in range(start, start + count):
+            # 每个用例独立播种，可由 (seed, index) 复现
+            case_data = generator.generate(random.Random(f"{seed}:{index}"))
+            outcome = self.diff_check(reference, case_data)
+            if outcome is None:
+                continue
+            checked += 1
+            if not outcome[0]:
+                return checked, (index, case_data, outcome[1], outcome[2])
+        return checked, None
+    
+    def shrink_case(self, reference: 'LeetCodeTester', generator: CaseGenerator, case_data: List,
+                    expected: Any, actual: Any, budget: int = 5000):
+        """贪心收缩分歧用例（候选保持在生成规格内），直到任何候选都不再触发分歧或评估次数用完"""
+        evaluations = 0
+        improved = True
+        while improved and evaluations < budget:
+            improved = False
+            for i, value in enumerate(case_data):
+                for candidate in generator.shrink_candidates(i, value):
+                    evaluations += 1
+                    trial = case_data[:i] + [candidate] + case_data[i + 1:]
+                    outcome = self.diff_check(reference, trial)
+                    if outcome is not None and not outcome[0]:
+                        case_data, expected, actual = trial, outcome[1], outcome[2]
+                        improved = True
+                        break
+                    if evaluations >= budget:
+                        break
+                if improved or evaluations >= budget:
+                    break
+        return case_data, expected, actual, evaluations
+    
+    def run_differential(self, reference_code: str, generator: CaseGenerator, total: int,
+                         seed: int, batch_size: int = 500):
+        """差分测试：随机生成用例，与参考解比较，发现分歧时收缩为最小反例"""
+        reference = LeetCodeTester()
+        if not reference.parse_solution_template(reference_code):
+            print(self.colorize_text("❌ Failed to parse reference solution", 'red'))
+            return False
+        
+        print(self.colorize_text(f"🎲 Differential testing: {total} cases, seed {seed}", 'bright_yellow'))
+        print("-" * 60)
+        
+        batches = [(start, min(batch_size, total - start)) for start in range(0, total, batch_size)]
+        checked = 0
+        mismatch = None
+        start_time = time.perf_counter()
+        
+        if self.jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_diff_worker,
+                                     initargs=(self.solution_code, reference_code, self.worker_settings(),
+                                               generator.spec)) as executor:
+                futures = [executor.submit(_run_diff_batch_in_worker, seed, start, count)
+                           for start, count in batches]
+                # 按批次顺序取结果，保证报告的是编号最小的分歧
+                for future in futures:
+                    batch_checked, mismatch = future.result()
+                    checked += batch_checked
+                    if mismatch:
+                        for pending in futures:
+                            pending.cancel()
+                        break
+        else:
+            for start, count in batches:
+                batch_checked, mismatch = self.run_diff_batch(reference, generator, seed, start, count)
+                checked += batch_checked
+                if mismatch:
+                    break
+        
+        elapsed = time.perf_counter() - start_time
+        print(f"{self.colorize_text('Checked:', 'cyan')} {checked} cases in {self.format_duration(elapsed)}"
+              f" ({checked / elapsed if elapsed else 0:.0f} cases/s)")
+        
+        if mismatch is None:
+            print("\n" + "=" * 60)
+            print(self.colorize_text(f"🎉 No disagreement with the reference solution ({checked} cases)",
+                                     'bright_green'))
+            print("=" * 60)
+            return True
+        
+        index, case_data, expected, actual = mismatch
+        print(self.colorize_text(f"❌ Disagreement on generated case #{index}", 'bright_red'))
+        print(f"{self.colorize_text('Original input:', 'cyan')} {self.format_value(case_data)}")
+        case_data, expected, actual, evaluations = self.shrink_case(reference, generator, case_data,
+                                                                       expected, actual)
+        print(self.colorize_text(f"🔍 Shrunk with {evaluations} evaluations", 'cyan'))
+        self.print_test_result(index, case_data, expected, actual, False, 0.0)
+        print("\n" + "=" * 60)
+        print(self.colorize_text("Minimal counterexample (input.txt / output.txt):", 'bright_yellow'))
+        for value in case_data:
+            print(json.dumps(value))
+        print(json.dumps(expected))
+        print("=" * 60)
+        return False
+    
     def process_result(self, result):
         """处理结果，转换特殊对象为可比较的格式"""
-        if isinstance(result, TreeNode):
-            return self.tree_to_list(result)
-        elif isinstance(result, ListNode):
-            return self.list_to_array(result)
+        node_type = self.node_types_by_class().get(type(result))
+        if node_type is not None:
+            return node_type.serialize(result)
+        elif isinstance(result, array) or type(result).__module__ == 'numpy':
+            # 紧凑数组（--compact-ints）转回普通列表再比较
+            return result.tolist()
         else:
             return result
     
+    def node_types_by_class(self) -> Dict[type, NodeType]:
+        """节点类 -> 节点类型：默认实现，以及解决方案模块中的同名类（每个解决方案只解析一次）"""
+        module = self.solution_module
+        if self.result_node_types is not None and self.result_node_types[0] is module:
+            return self.result_node_types[1]
+        
+        mapping = {}
+        for node_type in NODE_TYPES.values():
+            mapping.setdefault(node_type.default_class, node_type)
+            cls = module.__dict__.get(node_type.class_name) if module is not None else None
+            if isinstance(cls, type) and cls not in mapping:
+                try:
+                    mapping[cls] = self.node_type(node_type.class_name)
+                except ValueError:
+                    pass  # 无法判断是哪种 Node，只能依靠类型注解或 schema
+        self.result_node_types = (module, mapping)
+        return mapping
+    
+    def iter_results(self, pairs):
+        """按用例顺序产出 (case_data, expected, success, result, execution_time, metrics)"""
+        if self.jobs > 1:
+            yield from self.iter_parallel_results(pairs)
+            return
+        
+        for case_data, expected in pairs:
+            # 解决方案可能原地修改输入，历史记录需要运行前的用例哈希和输入快照（用于重新计时）
+            if self.history is not None:
+                case_hash = self.case_fingerprint(case_data, expected)
+                import pickle
+                snapshot = pickle.dumps(case_data, pickle.HIGHEST_PROTOCOL)
+            success, result, execution_time, metrics = self.run_test_case(case_data, expected)
+            if self.history is not None:
+                metrics['case_hash'] = case_hash
+                metrics['case_snapshot'] = snapshot
+            yield case_data, expected, success, result, execution_time, metrics
+    
+    def iter_parallel_results(self, pairs, chunk_size: int = 0):
+        """在进程池中分块运行用例，结果仍按用例顺序产出"""
+        chunk_size = chunk_size or self.default_chunk_size(pairs)
+        pairs = iter(pairs)
+        pending = deque()
+        
+        from concurrent.futures import ProcessPoolExecutor
+        
+        # 每个进程只接收并编译一次解决方案代码
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker,
+                                 initargs=(self.solution_code, self.worker_settings())) as executor:
+            while True:
+                # 最多保持 2*jobs 块在途，流式输入时内存依然有界
+                while len(pending) < self.jobs * 2:
+                    chunk = list(islice(pairs, chunk_size))
+                    if not chunk:
+                        break
+                    pending.append((chunk, executor.submit(_run_chunk_in_worker, chunk)))
+                
+                if not pending:
+                    break
+                
+                chunk, future = pending.popleft()
+                for (case_data, expected), outcome in zip(chunk, future.result()):
+                    yield (case_data, expected) + outcome
+    
+    def default_chunk_size(self, pairs) -> int:
+        """每个进程大约分到 4 块，兼顾负载均衡和进程间通信开销；流式输入长度未知时用固定块大小"""
+        if isinstance(pairs, list):
+            return max(1, min(64, len(pairs) // (self.jobs * 4)))
+        return 16
+    
+    def report_case(self, case_num: int, case_data: List, expected: Any, result: Any, success: bool,
+                    execution_time: float, metrics: Dict):
+        """按 --show 打印用例结果块，并记入统计和报告"""
+        if self.show_cases == 'all' or (self.show_cases == 'failed' and not success):
+            self.print_test_result(case_num, case_data, expected, result, success, execution_time, metrics)
+        self.record_result(case_num, case_data, expected, result, success, execution_time, metrics)
+    
+    def run_async_tests(self, pairs, total: Optional[int]) -> bool:
+        """--progress 模式：asyncio 调度工作进程运行用例并刷新进度行；Ctrl-C 取消运行并输出已完成部分的总结"""
+        import asyncio
+        progress = ProgressLine(total, self.colorize_text)
+        passed = 0
+        done = 0
+        
+        def handle(case_data, expected, success, result, execution_time, metrics):
+            nonlocal passed, done
+            done += 1
+            if self.show_cases == 'all' or (self.show_cases == 'failed' and not success):
+                progress.clear()
+            self.report_case(done, case_data, expected, result, success, execution_time, metrics)
+            if success:
+                passed += 1
+            progress.update(success)
+        
+        runner = AsyncCaseRunner(self, handle, self.jobs, self.max_in_flight or self.jobs * 2,
+                                 self.default_chunk_size(pairs))
+        try:
+            interrupted = asyncio.run(runner.run(pairs))
+        except KeyboardInterrupt:
+            # 清理工作进程期间再次按下 Ctrl-C：工作进程已被终止，直接输出部分总结
+            interrupted = True
+        progress.clear()
+        if interrupted:
+            self.run_stats['interrupted'] = True
+            print()
+            print(self.colorize_text(f"⚠️  Interrupted after {done}" + (f" of {total}" if total is not None else "")
+                                     + " cases", 'yellow'))
+        return self.finish_run(passed, done)
+    
+    def worker_settings(self) -> Dict:
+        """需要同步到工作进程的测试器设置"""
+        return {'limits': self.limits, 'bench': self.bench, 'reuse_instance': self.reuse_instance,
+                'solution_file': self.solution_file, 'cache': self.cache, 'memory_top': self.memory_top,
+                'target_class': self.target_class, 'target_method': self.target_method,
+                'op_stats_top': self.op_stats_top, 'profile_mode': self.profile_mode,
+                'compare_mode': self.compare_mode, 'tolerance': self.tolerance,
+                'validator_file': self.validator_file, 'int_array_mode': self.int_array_mode}
+    
     def run_all_tests(self):
         """运行所有测试用例"""
         if len(self.test_cases) != len(self.expected_outputs):
@@ -492,18 +3136,574 @@ class LeetCodeTester:
         print(self.colorize_text(f"🚀 Running {total} test cases...", 'bright_yellow'))
         print("-" * 60)
         
-        for i, (case_data, expected) in enumerate(zip(self.test_cases, self.expected_outputs)):
-            success, result, execution_time = self.run_test_case(case_data, expected)
-            self.print_test_result(i + 1, case_data, expected, result, success, execution_time)
+        self.reset_run_stats()
+        pairs = list(zip(self.test_cases, self.expected_outputs))
+        if self.progress:
+            return self.run_async_tests(pairs, total)
+        for i, (case_data, expected, success, result, execution_time, metrics) in enumerate(self.iter_results(pairs)):
+            self.report_case(i + 1, case_data, expected, result, success, execution_time, metrics)
             
             if success:
                 passed += 1
         
-        self.print_summary(passed, total)
-        return passed == total
+        return self.finish_run(passed, total)
+    
+    def run_streaming_tests(self, input_file: str, output_file: str):
+        """流式运行测试：边解析边执行，每个用例检查完即释放"""
+        passed = 0
+        total = 0
+        
+        print(self.colorize_text("🚀 Running test cases (streaming)...", 'bright_yellow'))
+        print("-" * 60)
+        
+        self.reset_run_stats()
+        try:
+            pairs = self.iter_test_pairs(input_file, output_file)
+            if self.progress:
+                return self.run_async_tests(pairs, None)
+            for case_data, expected, success, result, execution_time, metrics in self.iter_results(pairs):
+                total += 1
+                self.report_case(total, case_data, expected, result, success, execution_time, metrics)
+                
+                if success:
+                    passed += 1
+                # 释放当前用例，内存占用只取决于最大的单个用例
+                del case_data, expected, result
+        except ValueError as e:
+            print(self.colorize_text(f"❌ {e}", 'red'))
+            return False
+        except Exception as e:
+            print(self.colorize_text(f"❌ Error reading test files: {e}", 'red'))
+            return False
+        
+        return self.finish_run(passed, total)
+    
+    def case_fingerprint(self, case_data: List, expected: Any) -> str:
+        """用例内容指纹，用于判断用例是否新增或被修改"""
+        import hashlib
+        text = repr((case_data, getattr(case_data, 'limits', {}), expected))
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+    
+    def run_selected_tests(self, indices: List[int], fingerprints: List[str], results: Dict[str, bool]):
+        """按给定顺序运行部分用例，结果按运行前的指纹记入 results"""
+        # 每次在副本上运行：用例在多次运行之间保留，原地修改不能影响下一次运行
+        pairs = ((copy.deepcopy(self.test_cases[i]), self.expected_outputs[i]) for i in indices)
+        for i, (_, expected, success, result, execution_time, metrics) in zip(indices, self.iter_results(pairs)):
+            self.report_case(i + 1, self.test_cases[i], expected, result, success, execution_time, metrics)
+            results[fingerprints[i]] = success
+    
+    def run_watch(self, solution_file: str, input_file: str, output_file: str):
+        """监视模式：文件变化时在同一个解释器中重新运行受影响的用例"""
+        watcher = FileWatcher([solution_file, input_file, output_file])
+        solution_path, input_path, output_path = (os.path.abspath(path) for path in
+                                                  (solution_file, input_file, output_file))
+        # 指纹 -> 最近一次是否通过
+        results = {}
+        # 解决方案已在启动时载入，首次只需载入测试文件
+        changed = {input_path, output_path}
+        
+        try:
+            while True:
+                reload_solution = solution_path in changed
+                reload_fixtures = input_path in changed or output_path in changed
+                ok = True
+                
+                if reload_solution:
+                    with open(solution_file, 'r', encoding='utf-8') as f:
+                        ok = self.parse_solution_template(f.read())
+                    if not ok:
+                        print(self.colorize_text("❌ Failed to parse solution template", 'red'))
+                if ok and reload_fixtures:
+                    self.load_test_files(input_file, output_file)
+                    if len(self.test_cases) != len(self.expected_outputs):
+                        print(self.colorize_text(
+                            f"❌ Mismatch: {len(self.test_cases)} test cases, "
+                            f"{len(self.expected_outputs)} expected outputs", 'red'))
+                        ok = False
+                
+                if ok:
+                    fingerprints = [self.case_fingerprint(case_data, expected) for case_data, expected
+                                    in zip(self.test_cases, self.expected_outputs)]
+                    if reload_solution:
+                        # 解决方案变化：全部重跑，上次失败的用例优先
+                        previous = dict(results)
+                        results.clear()
+                        indices = sorted(range(len(fingerprints)),
+                                         key=lambda i: previous.get(fingerprints[i], False))
+                    else:
+                        # 只有测试文件变化：只跑新增或修改过的用例
+                        indices = [i for i, fp in enumerate(fingerprints) if fp not in results]
+                    
+                    print(self.colorize_text(
+                        f"🚀 Running {len(indices)} of {len(fingerprints)} test cases...", 'bright_yellow'))
+                    print("-" * 60)
+                    self.reset_run_stats()
+                    self.run_selected_tests(indices, fingerprints, results)
+                    
+                    passed = sum(1 for fp in fingerprints if results.get(fp))
+                    self.finish_run(passed, len(fingerprints))
+                
+                print(self.colorize_text(
+                    f"👀 Watching for changes ({watcher.backend}), Ctrl-C to exit...", 'cyan'))
+                changed = watcher.wait()
+                print("\n" + self.colorize_text(
+                    f"🔄 Changed: {', '.join(sorted(os.path.basename(path) for path in changed))} "
+                    f"({time.strftime('%H:%M:%S')})", 'bright_yellow'))
+        except KeyboardInterrupt:
+            print()
+            return True
+    
+    def run_batch(self, problems: List[str], root: str):
+        """在一个进程（或进程池）中运行多个题目，最后打印汇总表"""
+        print(self.colorize_text(f"🚀 Running {len(problems)} problems...", 'bright_yellow'))
+        print("-" * 60)
+        
+        # 每个题目使用自己的解决方案文件，其余设置共享；题目内部串行运行
+        settings = dict(self.worker_settings(), solution_file=None, validator_file=None)
+        summaries = []
+        start_time = time.perf_counter()
+        
+        def report(summary):
+            summaries.append(summary)
+            ok = summary['error'] is None and summary['passed'] == summary['total']
+            mark = self.colorize_text('✓', 'green') if ok else self.colorize_text('✗', 'red')
+            print(f"[{len(summaries)}/{len(problems)}] {mark} {os.path.relpath(summary['problem'], root)}")
+        
+        if self.jobs > 1 and len(problems) > 1:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+            with ProcessPoolExecutor(max_workers=min(self.jobs, len(problems))) as executor:
+                futures = [executor.submit(_run_problem, problem, settings) for problem in problems]
+                for future in as_completed(futures):
+                    report(future.result())
+        else:
+            for problem in problems:
+                report(_run_problem(problem, settings))
+        
+        summaries.sort(key=lambda summary: summary['problem'])
+        self.print_batch_summary(summaries, root, time.perf_counter() - start_time)
+        return all(summary['error'] is None and summary['passed'] == summary['total'] for summary in summaries)
+    
+    def print_batch_summary(self, summaries: List[Dict], root: str, wall_time: float):
+        """打印批量运行的汇总表：每个题目的通过数、耗时和首个失败"""
+        names = [os.path.relpath(summary['problem'], root) for summary in summaries]
+        width = min(max([len(name) for name in names] + [7]), 48)
+        
+        print("\n" + "=" * 60)
+        print(self.colorize_text(f"{'Problem':<{width}}  {'Passed':>9}  {'Time':>10}  Result", 'cyan'))
+        for name, summary in zip(names, summaries):
+            if len(name) > width:
+                name = '...' + name[-(width - 3):]
+            counts = f"{summary['passed']}/{summary['total']}"
+            if summary['error'] is not None:
+                result = self.colorize_text(f"⚠ {summary['error'][:60]}", 'red')
+            elif summary['passed'] == summary['total']:
+                result = self.colorize_text('✓', 'green')
+            else:
+                case_num, verdict = summary['first_failure']
+                result = self.colorize_text(f"✗ case {case_num} {verdict}", 'red')
+            print(f"{name:<{width}}  {counts:>9}  {self.format_duration(summary['time']):>10}  {result}")
+        
+        solved = sum(1 for summary in summaries
+                     if summary['error'] is None and summary['passed'] == summary['total'])
+        passed = sum(summary['passed'] for summary in summaries)
+        total = sum(summary['total'] for summary in summaries)
+        color = 'bright_green' if solved == len(summaries) else 'bright_yellow'
+        print("-" * 60)
+        print(f"{self.colorize_text(f'Problems: {solved}/{len(summaries)} passed', color)}  "
+              f"{self.colorize_text('Cases:', 'cyan')} {passed}/{total}  "
+              f"{self.colorize_text('Time:', 'cyan')} {self.format_duration(sum(s['time'] for s in summaries))} "
+              f"(wall {self.format_duration(wall_time)})")
+        print("=" * 60)
+
+def _current_address_space():
+    """当前进程的虚拟地址空间大小（字节），无法获取时返回 0"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return 0
+
+# 受限子进程因 MemoryError 无法返回结果时使用的退出码
+MEMORY_ERROR_EXIT_CODE = 86
+
+def _run_limited_child(tester, case_data, expected, cpu_time, memory_mb, conn):
+    """资源受限子进程：设置 rlimit 后运行用例并通过管道返回结果"""
+    import resource
+    
+    if cpu_time:
+        seconds = max(1, int(-(-cpu_time // 1)))  # RLIMIT_CPU 以整秒计，向上取整
+        used = int(resource.getrusage(resource.RUSAGE_SELF).ru_utime
+                   + resource.getrusage(resource.RUSAGE_SELF).ru_stime)
+        resource.setrlimit(resource.RLIMIT_CPU, (used + seconds, used + seconds + 1))
+    if memory_mb:
+        # 限制的是在已载入的解释器和用例之上还能分配的内存
+        limit = _current_address_space() + int(memory_mb * 1024 * 1024)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    
+    try:
+        success, result, execution_time, metrics = tester.execute_test_case(case_data, expected)
+        try:
+            conn.send((success, result, execution_time, metrics))
+        except MemoryError:
+            conn.send((False, LimitExceeded(LimitExceeded.MLE, "MemoryError"), execution_time, metrics))
+        except Exception:
+            # 无法序列化的结果以 repr 形式返回
+            conn.send((success, repr(result), execution_time, metrics))
+    except MemoryError:
+        # 连判定结果都发不出去：用约定的退出码告诉父进程是内存超限
+        os._exit(MEMORY_ERROR_EXIT_CODE)
+    conn.close()
+
+# 进程池工作进程中的测试器（每个进程初始化一次）
+_worker_tester = None
+# 差分测试工作进程中的参考解和用例生成器
+_worker_reference = None
+_worker_generator = None
+
+def _init_worker(solution_code: str, settings: Dict):
+    """工作进程初始化：只编译一次解决方案"""
+    global _worker_tester
+    _worker_tester = LeetCodeTester()
+    for name, value in settings.items():
+        setattr(_worker_tester, name, value)
+    _worker_tester.parse_solution_template(solution_code)
+
+def _init_diff_worker(solution_code: str, reference_code: str, settings: Dict, spec: str):
+    """差分测试工作进程初始化：候选解和参考解各编译一次"""
+    global _worker_tester, _worker_reference, _worker_generator
+    _init_worker(solution_code, settings)
+    _worker_reference = LeetCodeTester()
+    _worker_reference.parse_solution_template(reference_code)
+    _worker_generator = CaseGenerator(spec)
+
+def _run_diff_batch_in_worker(seed: int, start: int, count: int):
+    """在工作进程中生成并比较一批用例"""
+    return _worker_tester.run_diff_batch(_worker_reference, _worker_generator, seed, start, count)
+
+def _run_chunk_in_worker(chunk: List):
+    """在工作进程中运行一块用例，返回 [(success, result, execution_time, metrics), ...]"""
+    import pickle
+    results = []
+    for case_data, expected in chunk:
+        try:
+            success, result, execution_time, metrics = _worker_tester.run_test_case(case_data, expected)
+        except BaseException as e:
+            # 如 sys.exit()，不能让它终止工作进程
+            success, result, execution_time, metrics = False, f"Runtime error: {e!r}", 0.0, {}
+        try:
+            pickle.dumps(result)
+        except Exception:
+            # 无法序列化的结果以 repr 形式返回主进程
+            result = repr(result)
+        results.append((success, result, execution_time, metrics))
+    return results
+
+def _serve_chunks(tester: 'LeetCodeTester', conn):
+    """--progress 的工作进程：循环接收用例块并返回结果；Ctrl-C 由主进程统一处理"""
+    global _worker_tester
+    # 独立进程组：中断时主进程连同受限用例的子进程一起结束
+    os.setpgrp()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_tester = tester
+    while True:
+        try:
+            chunk = conn.recv()
+        except EOFError:
+            break
+        if chunk is None:
+            break
+        conn.send(_run_chunk_in_worker(chunk))
+
+class AsyncCaseRunner:
+    """asyncio 驱动的用例调度：用例分块交给 fork 出的工作进程，在途块数有界，结果按用例顺序交给 handle"""
+    def __init__(self, tester: 'LeetCodeTester', handle, jobs: int, max_in_flight: int, chunk_size: int):
+        self.tester = tester
+        # handle(case_data, expected, success, result, execution_time, metrics)
+        self.handle = handle
+        self.jobs = jobs
+        self.max_in_flight = max_in_flight
+        self.chunk_size = chunk_size
+        self.workers = []
+    
+    def start_worker(self):
+        import multiprocessing
+        ctx = multiprocessing.get_context('fork')
+        conn, child_conn = ctx.Pipe()
+        # 不设为 daemon：用例有资源限制时工作进程还要再 fork 子进程；主进程退出时管道关闭，工作进程随之结束
+        process = ctx.Process(target=_serve_chunks, args=(self.tester, child_conn))
+        process.start()
+        child_conn.close()
+        self.workers.append((process, conn))
+        return process, conn
+    
+    def stop_workers(self, kill: bool):
+        """正常结束时通知工作进程退出；中断时直接终止（当前用例可能是死循环）"""
+        for process, conn in self.workers:
+            if kill:
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    process.kill()  # 尚未建立进程组
+            else:
+                try:
+                    conn.send(None)
+                except OSError:
+                    pass
+        for process, conn in self.workers:
+            process.join()
+            conn.close()
+        self.workers = []
+    
+    def call_worker(self, worker, chunk: List):
+        """在线程中阻塞地发送一块用例并等待结果；工作进程意外退出时整块判为运行错误"""
+        process, conn = worker
+        try:
+            conn.send(chunk)
+            return conn.recv(), worker
+        except (EOFError, OSError):
+            process.join()
+            error = f"Runtime error: worker process exited with code {process.exitcode}"
+            return [(False, error, 0.0, {})] * len(chunk), None
+    
+    async def run_chunk(self, loop, threads, idle, chunk: List):
+        worker = await idle.get()
+        results, worker = await loop.run_in_executor(threads, self.call_worker, worker, chunk)
+        if worker is None:
+            # 工作进程已退出：换一个新的，并逐个重跑这一块，只让导致退出的用例失败
+            worker = self.start_worker()
+            if len(chunk) > 1:
+                results = []
+                for pair in chunk:
+                    single, worker = await loop.run_in_executor(threads, self.call_worker, worker, [pair])
+                    results += single
+                    worker = worker or self.start_worker()
+        idle.put_nowait(worker)
+        return results
+    
+    async def run(self, pairs) -> bool:
+        """运行全部用例，返回是否被 Ctrl-C 中断"""
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        loop = asyncio.get_running_loop()
+        idle = asyncio.Queue()
+        for _ in range(self.jobs):
+            idle.put_nowait(self.start_worker())
+        
+        pairs = iter(pairs)
+        pending = deque()
+        interrupted = False
+        with ThreadPoolExecutor(max_workers=self.jobs) as threads:
+            try:
+                while True:
+                    # 在途块数有界：流式输入时内存依然有界
+                    while len(pending) < self.max_in_flight:
+                        chunk = list(islice(pairs, self.chunk_size))
+                        if not chunk:
+                            break
+                        pending.append((chunk, loop.create_task(self.run_chunk(loop, threads, idle, chunk))))
+                    if not pending:
+                        break
+                    chunk, task = pending.popleft()
+                    for (case_data, expected), outcome in zip(chunk, await task):
+                        self.handle(case_data, expected, *outcome)
+            except asyncio.CancelledError:
+                # asyncio.run 收到 Ctrl-C 时取消主任务
+                interrupted = True
+                for _, task in pending:
+                    task.cancel()
+            finally:
+                # 先结束工作进程，阻塞在 recv 上的线程随之返回
+                self.stop_workers(kill=interrupted or bool(pending))
+        return interrupted
+
+def discover_problems(root: str) -> List[str]:
+    """递归查找题目目录：同时包含 solution.py、input.txt 和 output.txt 的目录"""
+    problems = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d != '__pycache__')
+        if {'solution.py', 'input.txt', 'output.txt'} <= set(filenames):
+            problems.append(dirpath)
+    return problems
+
+def changed_paths_since(root: str, ref: str) -> List[str]:
+    """相对 git 引用 ref 有变化（含未提交和未跟踪）的文件的绝对路径，只使用本地 git"""
+    import subprocess
+    
+    def git(*git_args):
+        return subprocess.run(['git', '-C', root] + list(git_args), check=True,
+                              capture_output=True, text=True).stdout
+    top = git('rev-parse', '--show-toplevel').strip()
+    names = git('diff', '--name-only', ref, '--', '.').splitlines()
+    names += git('ls-files', '--others', '--exclude-standard', '--full-name', '--', '.').splitlines()
+    return [os.path.normpath(os.path.join(top, name)) for name in names if name]
+
+def _run_problem(problem_dir: str, settings: Dict):
+    """运行一个题目的全部用例（不打印逐用例结果），返回汇总字典"""
+    summary = {'problem': problem_dir, 'passed': 0, 'total': 0, 'time': 0.0,
+               'first_failure': None, 'error': None}
+    tester = LeetCodeTester()
+    for name, value in settings.items():
+        setattr(tester, name, value)
+    tester.solution_file = os.path.join(problem_dir, 'solution.py')
+    validator_file = os.path.join(problem_dir, 'validator.py')
+    if os.path.exists(validator_file):
+        tester.validator_file = validator_file
+    
+    import contextlib
+    import io
+    
+    # 解决方案的调试输出不混入汇总表
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            with open(tester.solution_file, 'r', encoding='utf-8') as f:
+                if not tester.parse_solution_template(f.read()):
+                    summary['error'] = "failed to parse solution"
+                    return summary
+            pairs = tester.iter_test_pairs(os.path.join(problem_dir, 'input.txt'),
+                                           os.path.join(problem_dir, 'output.txt'))
+            for case_data, expected, success, result, execution_time, _ in tester.iter_results(pairs):
+                summary['total'] += 1
+                summary['time'] += execution_time
+                if success:
+                    summary['passed'] += 1
+                elif summary['first_failure'] is None:
+                    summary['first_failure'] = (summary['total'], case_verdict(success, result))
+        except (KeyboardInterrupt, GeneratorExit):
+            raise
+        except BaseException as e:
+            # 包括解决方案在导入时调用 sys.exit()
+            summary['error'] = f"{type(e).__name__}: {e}"
+    return summary
+
+def load_case_generator(generator_file: str):
+    """从生成器文件中载入 generate(n) 函数，它返回一个用例的参数列表"""
+    namespace = {'__name__': '__lutf_generator__'}
+    with open(generator_file, 'r', encoding='utf-8') as f:
+        exec(compile(f.read(), generator_file, 'exec'), namespace)
+    if not callable(namespace.get('generate')):
+        raise ValueError(f"{generator_file} does not define generate(n)")
+    return namespace['generate']
+
+def load_validator(validator_file: str):
+    """从校验文件中载入 validate(args, expected, actual) 函数，返回真值表示答案合法"""
+    namespace = {'__name__': '__lutf_validator__'}
+    with open(validator_file, 'r', encoding='utf-8') as f:
+        exec(compile(f.read(), validator_file, 'exec'), namespace)
+    if not callable(namespace.get('validate')):
+        raise ValueError(f"{validator_file} does not define validate(args, expected, actual)")
+    return namespace['validate']
+
+def build_arg_parser():
+    """构建命令行参数解析器"""
+    import argparse
+    parser = argparse.ArgumentParser(
+        prog="leetcode_tester.py",
+        description="LeetCode Universal Test Framework")
+    parser.add_argument("solution", nargs="?", help="solution file")
+    parser.add_argument("input", nargs="?", help="input file (default: input.txt next to the solution)")
+    parser.add_argument("output", nargs="?", help="output file (default: output.txt next to the solution)")
+    parser.add_argument("--batch", metavar="ROOT",
+                        help="run every problem folder (solution.py + input.txt + output.txt) under ROOT")
+    parser.add_argument("--changed-since", metavar="GIT_REF",
+                        help="with --batch, only run problem folders changed since this git ref")
+    parser.add_argument("--class", dest="target_class", metavar="NAME",
+                        help="class to test (default: Solution, else the first class defined in the file)")
+    parser.add_argument("--method", dest="target_method", metavar="NAME",
+                        help="method to call for function problems (default: first public method of the class)")
+    parser.add_argument("--watch", action="store_true",
+                        help="rerun affected test cases whenever the solution or test files change")
+    parser.add_argument("--format", choices=sorted(REPORTERS), default=None,
+                        help="also write a machine-readable report (JSON Lines or JUnit XML)")
+    parser.add_argument("--report", default="-", metavar="FILE",
+                        help="report destination for --format (default: stdout, human output moves to stderr)")
+    parser.add_argument("--report-truncate", type=int, default=200, metavar="CHARS",
+                        help="truncate input/expected/actual values in the report to this many characters")
+    parser.add_argument("--stream", action="store_true",
+                        help="parse and run test cases one at a time instead of loading them all first")
+    parser.add_argument("--compact-ints", choices=["array", "numpy"], default=None,
+                        help="load flat integer arrays from input.txt as array('q') or NumPy buffers")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="run test cases in N worker processes (0 = one per CPU)")
+    parser.add_argument("--progress", action="store_true",
+                        help="run cases in worker processes under an asyncio scheduler with a live progress "
+                             "line (passed/failed, cases/s, ETA); Ctrl-C stops and prints a partial summary")
+    parser.add_argument("--max-in-flight", type=int, default=0, metavar="N",
+                        help="with --progress, at most N chunks of cases queued or running (default 2 x jobs)")
+    parser.add_argument("--show", choices=["all", "failed", "none"], default="all",
+                        help="which per-case result blocks to print (default all)")
+    parser.add_argument("--timeout", type=float, default=None, metavar="SECONDS",
+                        help="per-case wall-clock limit (Time Limit Exceeded)")
+    parser.add_argument("--cpu-time", type=float, default=None, metavar="SECONDS",
+                        help="per-case CPU time limit (Time Limit Exceeded)")
+    parser.add_argument("--memory-limit", type=float, default=None, metavar="MB",
+                        help="per-case memory the solution may allocate (Memory Limit Exceeded)")
+    parser.add_argument("--compare", default="exact", metavar="MODE",
+                        help="how results are compared: exact (default), unordered[:N] (ignore the order of "
+                             "the outer N list levels) or sorted[:N] (compare after sorting them)")
+    parser.add_argument("--tolerance", type=float, default=None, metavar="TOL",
+                        help="compare floats with this relative and absolute tolerance")
+    parser.add_argument("--validator", default=None, metavar="FILE",
+                        help="file defining validate(args, expected, actual) for problems that accept any "
+                             "valid answer (default: validator.py next to the solution, if present)")
+    parser.add_argument("--cache", action="store_true",
+                        help="cache parsed test cases and the compiled solution on disk")
+    parser.add_argument("--cache-dir", default=None,
+                        help="cache directory (default: $LUTF_CACHE_DIR or ~/.cache/lutf)")
+    parser.add_argument("--cache-size", type=float, default=256, metavar="MB",
+                        help="evict least recently used cache entries beyond this size")
+    parser.add_argument("--history", nargs="?", const="", default=None, metavar="FILE",
+                        help="record per-case timings in a SQLite history and report slowdowns against it "
+                             "(default: history.sqlite in the cache directory)")
+    parser.add_argument("--history-window", type=int, default=10, metavar="RUNS",
+                        help="number of previous runs forming the rolling baseline")
+    parser.add_argument("--regression-threshold", type=float, default=0.5, metavar="RATIO",
+                        help="relative slowdown over the baseline median that counts as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="exit with a non-zero status when any case regressed against the history")
+    parser.add_argument("--reuse-instance", action="store_true",
+                        help="reuse one Solution instance across cases while it keeps no instance state")
+    parser.add_argument("--memory", type=int, nargs="?", const=3, default=0, metavar="TOP",
+                        help="measure peak memory of each solution call with tracemalloc and list "
+                             "the TOP allocation sites in the solution file (default 3)")
+    parser.add_argument("--op-stats", type=int, nargs="?", const=5, default=0, metavar="TOP",
+                        help="time every operation of design-class cases and report per-method latency "
+                             "histograms and the TOP slowest operations (default 5)")
+    parser.add_argument("--profile", nargs="?", const="cprofile", choices=["cprofile", "sample"], default=None,
+                        help="profile each solution call with cProfile or a low-overhead SIGPROF sampler "
+                             "and list the hotspots per case and for the whole run")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="rows in the run-wide hotspot table")
+    parser.add_argument("--profile-out", metavar="FILE",
+                        help="write the run-wide profile (.pstats for cprofile, collapsed stacks for sample)")
+    parser.add_argument("--bench", action="store_true",
+                        help="benchmark each passing case (excludes input construction and output conversion)")
+    parser.add_argument("--warmup", type=int, default=3, help="untimed warmup runs per case in --bench mode")
+    parser.add_argument("--repeat", type=int, default=20, help="timed samples per case in --bench mode")
+    parser.add_argument("--min-sample-time", type=float, default=1e-3, metavar="SECONDS",
+                        help="calibrate loops so each --bench sample takes at least this long")
+    parser.add_argument("--disable-gc", action="store_true", help="disable garbage collection while timing")
+    parser.add_argument("--complexity", type=int, nargs="?", const=1, default=None, metavar="CASE",
+                        help="estimate Big-O by scaling test case CASE (default 1) to growing sizes")
+    parser.add_argument("--generator", metavar="FILE",
+                        help="file defining generate(n) that builds a case of size n for --complexity")
+    parser.add_argument("--reference", metavar="FILE",
+                        help="differential testing: compare against this trusted (brute-force) solution")
+    parser.add_argument("--gen", metavar="SPEC",
+                        help="argument spec for --reference, e.g. 'int[1..100](-10^9..10^9); int(1..50)'")
+    parser.add_argument("--cases", type=int, default=1000, help="number of generated cases for --reference")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for --reference (default: random)")
+    parser.add_argument("--batch-size", type=int, default=500, help="generated cases per batch for --reference")
+    parser.add_argument("--min-size", type=int, default=256, help="smallest size for --complexity")
+    parser.add_argument("--max-size", type=int, default=1 << 16, help="largest size for --complexity")
+    parser.add_argument("--complexity-memory", action="store_true",
+                        help="also fit peak memory in --complexity mode")
+    parser.add_argument("--max-exponent", type=float, default=None,
+                        help="fail if the measured time exponent exceeds this value")
+    return parser
 
 def main():
     # 检查参数数量
+    setup_colors()
     if len(sys.argv) < 2:
         color_code = Fore.RED if COLORS_AVAILABLE else ""
         reset_code = Style.RESET_ALL if COLORS_AVAILABLE else ""
@@ -511,7 +3711,95 @@ def main():
         print("If input.txt and output.txt are not specified, will look for them in the solution directory")
         sys.exit(1)
     
-    solution_file = sys.argv[1]
+    args = build_arg_parser().parse_args()
+    if args.batch:
+        run_batch_cli(args)
+        return
+    if not args.format:
+        run_cli(args)
+        return
+    
+    # 报告写到 stdout 时，人类可读的输出改写到 stderr
+    to_stdout = args.report == '-'
+    report_stream = sys.stdout if to_stdout else open(args.report, 'w', encoding='utf-8')
+    suite_name = os.path.splitext(os.path.basename(args.solution))[0]
+    reporter = None
+    try:
+        import contextlib
+        with contextlib.redirect_stdout(sys.stderr) if to_stdout else contextlib.nullcontext():
+            reporter = REPORTERS[args.format](report_stream, suite_name, args.report_truncate)
+            run_cli(args, reporter)
+    finally:
+        if reporter is not None:
+            reporter.close()
+        if not to_stdout:
+            report_stream.close()
+
+def resolve_int_array_mode(mode: Optional[str]) -> Optional[str]:
+    """--compact-ints 的实际模式：没有安装 numpy 时退回 array('q')"""
+    if mode == 'numpy':
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            print("💡 Tip: Install numpy for --compact-ints numpy, falling back to array('q')")
+            return 'array'
+    return mode
+
+def run_batch_cli(args):
+    """--batch 模式：发现题目目录并批量运行，通过 sys.exit 返回退出码"""
+    import subprocess
+    root = os.path.abspath(args.batch)
+    if not os.path.isdir(root):
+        print(f"❌ Batch root not found: {root}")
+        sys.exit(1)
+    try:
+        ResultComparator.parse_spec(args.compare)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if args.format:
+        # 批量运行只汇总每个题目的结果，没有逐用例记录可写
+        print(f"❌ --format {args.format} is not supported with --batch")
+        sys.exit(1)
+    
+    problems = discover_problems(root)
+    if args.changed_since:
+        try:
+            changed = changed_paths_since(root, args.changed_since)
+        except (OSError, subprocess.CalledProcessError) as e:
+            detail = getattr(e, 'stderr', '') or e
+            print(f"❌ git failed for --changed-since {args.changed_since}: {str(detail).strip()}")
+            sys.exit(1)
+        problems = [problem for problem in problems
+                    if any(path.startswith(problem + os.sep) for path in changed)]
+    
+    print("🔧 LeetCode Universal Test Framework")
+    print(f"Batch: {root}" + (f" (changed since {args.changed_since})" if args.changed_since else ""))
+    print()
+    if not problems:
+        print("No problem folders to run")
+        sys.exit(0)
+    
+    tester = LeetCodeTester()
+    if args.cache:
+        tester.cache = DiskCache(args.cache_dir or default_cache_dir(), int(args.cache_size * 1024 * 1024))
+    tester.jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    tester.int_array_mode = resolve_int_array_mode(args.compact_ints)
+    tester.reuse_instance = args.reuse_instance
+    tester.target_class = args.target_class
+    tester.target_method = args.target_method
+    tester.limits = {'timeout': args.timeout, 'cpu_time': args.cpu_time, 'memory_mb': args.memory_limit}
+    tester.compare_mode = args.compare
+    tester.tolerance = args.tolerance
+    success = tester.run_batch(problems, root)
+    sys.exit(0 if success else 1)
+
+def run_cli(args, reporter=None):
+    """按命令行参数运行测试器，通过 sys.exit 返回退出码"""
+    solution_file = args.solution
+    if not solution_file:
+        print("❌ Missing solution file (or use --batch ROOT)")
+        sys.exit(1)
     
     # 检查solution文件是否存在
     if not os.path.exists(solution_file):
@@ -521,37 +3809,92 @@ def main():
     # 获取solution文件所在目录
     solution_dir = os.path.dirname(os.path.abspath(solution_file))
     
+    # 差分测试和自定义生成器不需要 input.txt / output.txt
+    needs_fixtures = not (args.reference or args.generator)
+    
     # 确定input和output文件路径
-    if len(sys.argv) >= 3:
-        input_file = sys.argv[2]
+    if args.input:
+        input_file = args.input
     else:
         input_file = os.path.join(solution_dir, "input.txt")
         if not os.path.exists(input_file):
-            print(f"❌ Input file not found: {input_file}")
-            print("💡 Create input.txt in the solution directory or specify input file path")
-            sys.exit(1)
+            if needs_fixtures:
+                print(f"❌ Input file not found: {input_file}")
+                print("💡 Create input.txt in the solution directory or specify input file path")
+                sys.exit(1)
+            input_file = None
     
-    if len(sys.argv) >= 4:
-        output_file = sys.argv[3]
+    if args.output:
+        output_file = args.output
     else:
         output_file = os.path.join(solution_dir, "output.txt")
         if not os.path.exists(output_file):
-            print(f"❌ Output file not found: {output_file}")
-            print("💡 Create output.txt in the solution directory or specify output file path")
-            sys.exit(1)
+            if needs_fixtures:
+                print(f"❌ Output file not found: {output_file}")
+                print("💡 Create output.txt in the solution directory or specify output file path")
+                sys.exit(1)
+            output_file = None
+    
+    # 接受任意合法答案的题目：--validator，或解决方案目录中的 validator.py
+    validator_file = args.validator
+    if not validator_file and os.path.exists(os.path.join(solution_dir, "validator.py")):
+        validator_file = os.path.join(solution_dir, "validator.py")
     
     # 提示安装colorama以获得更好的体验
-    if not COLORS_AVAILABLE:
+    if COLORAMA_MISSING:
         print("💡 Tip: Install colorama for colored output: pip install colorama")
         print()
     
     print("🔧 LeetCode Universal Test Framework")
     print(f"Solution: {solution_file}")
-    print(f"Input: {input_file}")
-    print(f"Output: {output_file}")
+    if input_file:
+        print(f"Input: {input_file}")
+    if output_file:
+        print(f"Output: {output_file}")
+    if validator_file:
+        print(f"Validator: {validator_file}")
     print()
     
     tester = LeetCodeTester()
+    tester.solution_file = os.path.abspath(solution_file)
+    tester.reporter = reporter
+    if args.cache:
+        tester.cache = DiskCache(args.cache_dir or default_cache_dir(), int(args.cache_size * 1024 * 1024))
+    if args.history is not None or args.fail_on_regression:
+        tester.history = PerfHistory(args.history or os.path.join(args.cache_dir or default_cache_dir(),
+                                                                  'history.sqlite'),
+                                     window=args.history_window, threshold=args.regression_threshold)
+        tester.fail_on_regression = args.fail_on_regression
+    tester.int_array_mode = resolve_int_array_mode(args.compact_ints)
+    tester.jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    tester.progress = args.progress
+    tester.max_in_flight = args.max_in_flight
+    tester.show_cases = args.show
+    tester.reuse_instance = args.reuse_instance
+    tester.target_class = args.target_class
+    tester.target_method = args.target_method
+    tester.op_stats_top = args.op_stats
+    tester.profile_mode = args.profile
+    tester.profile_top = args.profile_top
+    tester.profile_out = args.profile_out
+    if tester.profile_mode == 'sample' and not hasattr(signal, 'setitimer'):
+        print("💡 Tip: --profile sample needs setitimer (Unix), falling back to cprofile")
+        tester.profile_mode = 'cprofile'
+    tester.memory_top = args.memory
+    tester.limits = {'timeout': args.timeout, 'cpu_time': args.cpu_time, 'memory_mb': args.memory_limit}
+    tester.compare_mode = args.compare
+    tester.tolerance = args.tolerance
+    tester.validator_file = validator_file
+    try:
+        ResultComparator.parse_spec(args.compare)
+        if validator_file:
+            load_validator(validator_file)
+    except (OSError, SyntaxError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if args.bench:
+        tester.bench = {'warmup': args.warmup, 'repeat': args.repeat,
+                        'min_time': args.min_sample_time, 'disable_gc': args.disable_gc}
     
     # 读取解决方案代码
     try:
@@ -568,10 +3911,51 @@ def main():
         sys.exit(1)
     print("✓ Solution template parsed")
     
+    # 差分测试模式
+    if args.reference:
+        if not args.gen:
+            print("❌ --reference needs a generator spec, e.g. --gen 'int[1..100](-10^9..10^9)'")
+            sys.exit(1)
+        try:
+            generator = CaseGenerator(args.gen)
+            with open(args.reference, 'r', encoding='utf-8') as f:
+                reference_code = f.read()
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        import random
+        seed = args.seed if args.seed is not None else random.randrange(1 << 32)
+        success = tester.run_differential(reference_code, generator, args.cases, seed, args.batch_size)
+        sys.exit(0 if success else 1)
+    
+    # 复杂度估计模式
+    if args.complexity is not None or args.generator:
+        if args.generator:
+            make_case = load_case_generator(args.generator)
+        else:
+            cases = list(islice(tester.iter_input_cases(input_file), args.complexity))
+            if args.complexity < 1 or len(cases) < args.complexity:
+                print(f"❌ Test case {args.complexity} not found in {input_file}")
+                sys.exit(1)
+            base_case = cases[-1]
+            make_case = lambda n: tester.scale_case(base_case, n)
+        success = tester.run_complexity_analysis(make_case, args.min_size, args.max_size,
+                                                 args.complexity_memory, args.max_exponent)
+        sys.exit(0 if success else 1)
+    
+    # 监视模式：文件变化时重新运行
+    if args.watch:
+        tester.run_watch(solution_file, input_file, output_file)
+        sys.exit(0)
+    
+    # 流式模式：边读边测，不预先载入全部用例
+    if args.stream:
+        success = tester.run_streaming_tests(input_file, output_file)
+        sys.exit(0 if success else 1)
+    
     # 解析测试用例
-    tester.parse_input_file(input_file)
-    tester.parse_output_file(output_file)
-    print(f"✓ Test cases loaded: {len(tester.test_cases)} cases")
+    from_cache = tester.load_test_files(input_file, output_file)
+    print(f"✓ Test cases loaded: {len(tester.test_cases)} cases{' (cached)' if from_cache else ''}")
     
     # 运行测试
     success = tester.run_all_tests()
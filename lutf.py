@@ -0,0 +1,9 @@
+#!/usr/bin/env python3
+"""leetcode_tester 的启动脚本：作为模块导入时复用字节码缓存（__pycache__），不必每次重新编译整个测试器
+
+用法同 leetcode_tester.py：python lutf.py solution.py [input.txt] [output.txt] [选项]
+"""
+from leetcode_tester import main
+
+if __name__ == "__main__":
+    main()